@@ -0,0 +1,82 @@
+import os
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, BinaryIO, Iterable, Iterator
+
+import msgpack
+import orjson
+import zstandard
+
+# Intermediate artifacts are only read back by code, so they are written as
+# zstd-compressed msgpack; only final, human-facing outputs stay JSON.
+ARTIFACT_EXT = ".msgpack.zst"
+# Level 3 is zstd's default: several-fold smaller on our text-heavy records
+# at a compression speed well above disk throughput
+ZSTD_LEVEL = 3
+
+
+def _encode_default(obj: Any) -> Any:
+    # Match orjson, which writes dates and datetimes as ISO strings
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    raise TypeError(f"Cannot serialize {type(obj).__name__} to msgpack")
+
+
+def packer() -> msgpack.Packer:
+    return msgpack.Packer(use_bin_type=True, default=_encode_default)
+
+
+# ==========================================================
+# 📦 Writers
+# ==========================================================
+def write_json(path: str, obj: Any):
+    """Write obj as indented UTF-8 JSON (orjson; non-string dict keys allowed)."""
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+
+@contextmanager
+def open_artifact(path: str) -> Iterator[BinaryIO]:
+    """Binary writer that zstd-compresses everything written to it, as it is written."""
+    with open(path, "wb") as raw:
+        with zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(raw, closefd=False) as f:
+            yield f
+
+
+def write_msgpack(path: str, obj: Any):
+    """Write obj as a single compressed msgpack document."""
+    with open_artifact(path) as f:
+        f.write(packer().pack(obj))
+
+
+def pack_array(f, p: msgpack.Packer, items: Iterable[Any], length: int):
+    """Stream an array of known length one item at a time."""
+    f.write(p.pack_array_header(length))
+    for item in items:
+        f.write(p.pack(item))
+
+
+def write_msgpack_list(path: str, items: list):
+    """Write a list item by item, so no full encoded copy is ever held."""
+    p = packer()
+    with open_artifact(path) as f:
+        pack_array(f, p, items, len(items))
+
+
+def intermediate_path(name: str, directory: str = "data") -> str:
+    return os.path.join(directory, name + ARTIFACT_EXT)
+
+
+# ==========================================================
+# 📂 Readers
+# ==========================================================
+def read_artifact(path: str) -> Any:
+    """Load an artifact written by this module, picking the format from its extension."""
+    with open(path, "rb") as f:
+        if not path.endswith(ARTIFACT_EXT):
+            return orjson.loads(f.read())
+        # Streamed frames carry no content size, so decode through a reader
+        with zstandard.ZstdDecompressor().stream_reader(f) as reader:
+            # Gap/trend reports may carry non-string keys (orjson's OPT_NON_STR_KEYS)
+            unpacker = msgpack.Unpacker(reader, raw=False, strict_map_key=False)
+            return unpacker.unpack()
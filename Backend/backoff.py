@@ -0,0 +1,66 @@
+import random
+from typing import Optional
+
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+
+# Rate limiting and server-side failures clear up on their own; any other
+# 4xx (bad request, auth, not found) will fail the same way every time.
+TRANSIENT_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_DELAY = 30.0
+
+
+class TransientHTTPError(Exception):
+    """A response worth retrying later (429/5xx), with the server's Retry-After if sent."""
+
+    def __init__(self, status: int, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class EmptyResponseError(Exception):
+    """The model answered but produced no parsed output."""
+
+
+def is_transient(status: int) -> bool:
+    return status in TRANSIENT_STATUSES
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (the HTTP-date form is ignored)."""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None, cap: float = MAX_DELAY) -> float:
+    """
+    Exponential backoff with jitter for the given 0-based attempt; a longer
+    server-requested Retry-After wins, up to `cap`.
+    """
+    delay = min(cap, 2 ** attempt) + random.uniform(0, 1)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+
+def retry_openai(max_attempts: int = 3):
+    """
+    tenacity policy for OpenAI calls: back off on rate limits, connection
+    errors/timeouts, 5xx and empty parses; re-raise anything else at once.
+    Build clients with ``max_retries=0`` so the SDK doesn't retry underneath.
+    """
+    import openai
+
+    return retry(
+        retry=retry_if_exception_type((
+            openai.RateLimitError,
+            openai.APIConnectionError,
+            openai.InternalServerError,
+            EmptyResponseError,
+        )),
+        wait=wait_exponential_jitter(initial=1, max=MAX_DELAY),
+        stop=stop_after_attempt(max_attempts),
+        reraise=True,
+    )
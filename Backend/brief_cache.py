@@ -0,0 +1,104 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================================
+# 🧩 Brief Fragment Cache
+# ==========================================================
+class BriefFragmentCache:
+    """
+    Generated briefs stored per topic cluster, so runs can be assembled
+    from earlier fragments.
+
+    Re-clustering a topic list with a few new entries reshuffles every
+    cluster, which defeats prompt-keyed caching. Instead, earlier clusters
+    whose topics are all still present are reused as-is, and only the
+    leftover topics are clustered and sent to the LLM.
+    """
+
+    def __init__(self, path: str = "data/cache/briefs.sqlite",
+                 ttl_seconds: Optional[float] = 7 * 24 * 3600):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.ttl_seconds = ttl_seconds
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS brief_fragments (
+                    key TEXT PRIMARY KEY,
+                    source_type TEXT NOT NULL,
+                    priority TEXT NOT NULL,
+                    topics TEXT NOT NULL,
+                    brief TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_brief_fragments_group "
+                "ON brief_fragments(source_type, priority)"
+            )
+            self._conn.commit()
+        self.stats = {"reused": 0, "stored": 0}
+
+    @staticmethod
+    def make_key(topics: Iterable[str], source_type: str, priority: str) -> str:
+        payload = json.dumps([sorted(topics), source_type, priority])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def reuse(self, topics: List[str], source_type: str,
+              priority: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Return (briefs from stored clusters fully covered by ``topics``, uncovered topics)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT topics, brief, created_at FROM brief_fragments "
+                "WHERE source_type = ? AND priority = ?",
+                (source_type, priority),
+            ).fetchall()
+
+        now = time.time()
+        fragments = [
+            (json.loads(stored_topics), brief)
+            for stored_topics, brief, created_at in rows
+            if self.ttl_seconds is None or now - created_at <= self.ttl_seconds
+        ]
+        # Largest clusters first, so one big cached brief beats several small ones
+        fragments.sort(key=lambda fragment: len(fragment[0]), reverse=True)
+
+        remaining = set(topics)
+        briefs = []
+        for fragment_topics, brief in fragments:
+            if fragment_topics and remaining.issuperset(fragment_topics):
+                remaining.difference_update(fragment_topics)
+                briefs.append(json.loads(brief))
+        self.stats["reused"] += len(briefs)
+        return briefs, [t for t in topics if t in remaining]
+
+    def put_many(self, fragments: Iterable[Tuple[List[str], str, str, Dict[str, Any]]]) -> None:
+        """Store (topics, source_type, priority, brief) rows in a single transaction."""
+        now = time.time()
+        payload = [
+            (self.make_key(topics, source_type, priority), source_type, priority,
+             json.dumps(sorted(topics)), json.dumps(brief), now)
+            for topics, source_type, priority, brief in fragments
+        ]
+        if not payload:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO brief_fragments "
+                "(key, source_type, priority, topics, brief, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                payload,
+            )
+            self._conn.commit()
+        self.stats["stored"] += len(payload)
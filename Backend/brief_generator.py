@@ -1,13 +1,196 @@
+import asyncio
+import functools
+import json
 import logging
-from openai import OpenAI
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
-from dotenv import load_dotenv
+from typing import List, Dict, Any, Final, Literal, Optional, Tuple
+from pydantic import BaseModel, TypeAdapter, ValidationError
+import numpy as np
 import os
 
-load_dotenv()
+from brief_cache import BriefFragmentCache
+from concurrency import cpu_pool
+from embed_cache import EmbeddingCache, shared_embed_cache
+from llm_cache import LLMCache, shared_llm_cache
+
+# `openai`/`httpx` are imported lazily in ContentBriefGenerator.__init__ and
+# `.env` is loaded by the entry point, keeping this module cheap to import.
 logger = logging.getLogger(__name__)
 
+# Static instructions live in the system prompt so every call shares a
+# byte-identical prefix for provider-side prompt caching; only the topics,
+# source type and priority go in the user message. Keep this free of
+# interpolation.
+SYSTEM_PROMPT: Final[str] = """You are a professional content strategist who writes structured, insightful briefs.
+You are a senior content strategist specializing in deep-tech storytelling.
+
+Your task is to translate highly technical AI topics into structured, marketing-ready content briefs for a non-engineering marketing team.
+
+### INSTRUCTIONS
+1. Group the topics into **3–7 logical, insight-driven clusters** based on real technical relationships.
+2. For each cluster, create **one structured content brief**.
+3. The briefs must NOT be generic. Each point should:
+   - reflect the true technical meaning of the topics,
+   - help a marketing team understand why the topic matters,
+   - provide angles that can be used for campaign planning, messaging, or content creation.
+
+### Each brief must include:
+- **audience** (who this content is for)
+- **job_to_be_done** (what the marketer should accomplish with this content)
+- **angle** (the narrative POV that makes the topic meaningful)
+- **promise** (what the audience gains from this content)
+- **cta** (the action we want readers to take)
+- **key_talking_points** (3–6 *specific, non-generic* insights that explain the topic clearly to non-technical stakeholders)
+
+### OUTPUT FORMAT
+Return a **single JSON object** with key `"briefs"`, whose value is a list of briefs.
+Do NOT include extra commentary. Only return the JSON.
+"""
+
+# Used when topics are pre-clustered locally: one small call per cluster,
+# each returning exactly one brief.
+SINGLE_BRIEF_SYSTEM_PROMPT: Final[str] = """You are a professional content strategist who writes structured, insightful briefs.
+You are a senior content strategist specializing in deep-tech storytelling.
+
+Your task is to translate a group of closely related, highly technical AI topics into ONE structured, marketing-ready content brief for a non-engineering marketing team.
+
+### INSTRUCTIONS
+1. Treat the topics as a single insight-driven cluster and give it a concise, specific `topic` name.
+2. The brief must NOT be generic. Each point should:
+   - reflect the true technical meaning of the topics,
+   - help a marketing team understand why the topic matters,
+   - provide angles that can be used for campaign planning, messaging, or content creation.
+
+### The brief must include:
+- **audience** (who this content is for)
+- **job_to_be_done** (what the marketer should accomplish with this content)
+- **angle** (the narrative POV that makes the topic meaningful)
+- **promise** (what the audience gains from this content)
+- **cta** (the action we want readers to take)
+- **key_talking_points** (3–6 *specific, non-generic* insights that explain the topic clearly to non-technical stakeholders)
+
+### OUTPUT FORMAT
+Return a **single JSON object** describing one brief.
+Do NOT include extra commentary. Only return the JSON.
+"""
+
+USER_PROMPT_TEMPLATE: Final[str] = """### Topics:
+{topics_block}
+
+Source Type: {source_type}
+Priority: {priority}
+"""
+
+
+# ==========================================================
+# 🧮 Local Topic Clustering (spherical k-means + silhouette)
+# ==========================================================
+def _kmeans(vectors: np.ndarray, k: int, n_iter: int = 50, seed: int = 0) -> np.ndarray:
+    """Spherical k-means with k-means++ seeding on L2-normalized vectors."""
+    rng = np.random.default_rng(seed)
+    centers = [vectors[rng.integers(len(vectors))]]
+    for _ in range(1, k):
+        dist = np.clip(1 - vectors @ np.array(centers).T, 0, None).min(axis=1)
+        probs = dist / dist.sum() if dist.sum() > 0 else None
+        centers.append(vectors[rng.choice(len(vectors), p=probs)])
+    centers = np.array(centers)
+
+    labels = np.argmax(vectors @ centers.T, axis=1)
+    eye = np.eye(k, dtype=vectors.dtype)
+    for _ in range(n_iter):
+        # Per-cluster sums as one matmul; empty clusters keep their center
+        sums = eye[labels].T @ vectors
+        counts = np.bincount(labels, minlength=k)
+        new_centers = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+        new_centers /= np.linalg.norm(new_centers, axis=1, keepdims=True) + 1e-12
+        new_labels = np.argmax(vectors @ new_centers.T, axis=1)
+        centers = new_centers
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+    return labels
+
+
+def _silhouette(dist: np.ndarray, labels: np.ndarray) -> float:
+    """Mean silhouette score from a precomputed cosine-distance matrix (needs >= 2 clusters)."""
+    _, inverse = np.unique(labels, return_inverse=True)
+    onehot = np.eye(inverse.max() + 1, dtype=dist.dtype)[inverse]
+    counts = onehot.sum(axis=0)
+    # Summed distance from every point to every cluster, in one matmul
+    sums = dist @ onehot
+    rows = np.arange(len(labels))
+    own = counts[inverse]
+
+    a = sums[rows, inverse] / np.maximum(own - 1, 1)
+    other_means = sums / counts
+    other_means[rows, inverse] = np.inf
+    b = other_means.min(axis=1)
+
+    denom = np.maximum(a, b)
+    scores = np.where((own > 1) & (denom > 0), (b - a) / np.where(denom > 0, denom, 1), 0.0)
+    return float(scores.mean())
+
+
+def normalize_topic(topic: str) -> str:
+    """Strip and collapse internal whitespace."""
+    return " ".join(topic.split())
+
+
+def dedupe_topics(topics: List[str]) -> List[str]:
+    """Normalize topics and drop case-insensitive duplicates, keeping first-seen order."""
+    unique: Dict[str, str] = {}
+    for topic in topics:
+        normalized = normalize_topic(topic)
+        if normalized:
+            unique.setdefault(normalized.casefold(), normalized)
+    return list(unique.values())
+
+
+def semantic_dedupe(
+    topics: List[str], embeddings: np.ndarray, threshold: float = 0.9
+) -> Tuple[List[str], np.ndarray]:
+    """Greedily keep a topic only if its cosine similarity to every kept topic is below threshold."""
+    vectors = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    sims = vectors @ vectors.T
+    kept: List[int] = []
+    for i in range(len(topics)):
+        if not kept or sims[i, kept].max() < threshold:
+            kept.append(i)
+    return [topics[i] for i in kept], embeddings[kept]
+
+
+def cluster_topics(
+    topics: List[str], embeddings: np.ndarray, min_k: int = 3, max_k: int = 7
+) -> List[List[str]]:
+    """Group topics into min_k..max_k clusters, picking k by silhouette score."""
+    if len(topics) <= min_k:
+        return [[t] for t in topics]
+
+    vectors = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    # Same for every k, so build the distance matrix once for the whole sweep
+    dist = 1 - vectors @ vectors.T
+    best_labels, best_score = None, -np.inf
+    for k in range(min_k, min(max_k, len(topics) - 1) + 1):
+        labels = _kmeans(vectors, k)
+        if len(set(labels.tolist())) < 2:
+            continue
+        score = _silhouette(dist, labels)
+        if score > best_score:
+            best_labels, best_score = labels, score
+
+    if best_labels is None:
+        return [topics]
+
+    clusters: Dict[int, List[str]] = {}
+    for topic, label in zip(topics, best_labels.tolist()):
+        clusters.setdefault(label, []).append(topic)
+    return list(clusters.values())
+
+
+# The k-means/silhouette sweep is CPU-bound, so large topic sets go to a small
+# process pool (shared, created on first use) instead of stalling the event loop.
+# Below the cut-off, pickling and IPC cost more than the clustering itself.
+CPU_POOL_MIN_TOPICS: Final[int] = 512
+
 
 # ==========================================================
 # 🎯 Structured Models
@@ -31,122 +214,486 @@ class BriefList(BaseModel):
     briefs: List[BriefItem]
 
 
+# Built once; dumps a whole list of briefs in a single pydantic-core pass
+_BRIEF_LIST_ADAPTER = TypeAdapter(List[BriefItem])
+
+
+@functools.lru_cache(maxsize=None)
+def _text_format(response_model: type) -> Dict[str, Any]:
+    """
+    Strict JSON-schema `text.format` param for a response model, derived
+    once per model instead of on every `responses.*` call.
+    """
+    from openai.lib._pydantic import to_strict_json_schema
+
+    return {
+        "type": "json_schema",
+        "name": response_model.__name__,
+        "schema": to_strict_json_schema(response_model),
+        "strict": True,
+    }
+
+
 # ==========================================================
 # 🧠 Content Brief Generator
 # ==========================================================
 class ContentBriefGenerator:
-    def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+    MODEL = "gpt-4o-2024-08-06"
+    EMBEDDING_MODEL = "text-embedding-3-small"
+    # Retries with backoff (429/5xx/timeouts, honouring Retry-After) are
+    # handled by the SDK itself
+    MAX_RETRIES = 3
+    TIMEOUT = 60.0
+    CONNECT_TIMEOUT = 10.0
+    BATCH_POLL_BASE = 10.0
+    BATCH_POLL_CAP = 300.0
+    BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+    MAX_CONCURRENT_CALLS = 8
+
+    def __init__(
+        self,
+        api_key: str,
+        cache: Optional[LLMCache] = None,
+        use_cache: bool = True,
+        embed_cache: Optional[EmbeddingCache] = None,
+        fragment_cache: Optional[BriefFragmentCache] = None,
+        cluster_locally: bool = True,
+        enable_hedging: bool = False,
+        hedge_delay: float = 8.0,
+    ):
+        import httpx
+        from openai import AsyncOpenAI
+
+        # Settings only: each run swaps in its own pooled transport (see
+        # _generate_content_briefs_async), so this one never opens a socket
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            max_retries=self.MAX_RETRIES,
+            timeout=httpx.Timeout(self.TIMEOUT, connect=self.CONNECT_TIMEOUT),
+        )
+        self.cache = (cache or shared_llm_cache()) if use_cache else None
+        self.embed_cache = (embed_cache or shared_embed_cache()) if use_cache else None
+        self.fragment_cache = (fragment_cache or BriefFragmentCache()) if use_cache else None
+        self.cluster_locally = cluster_locally
+        # Hedging fires a duplicate request after `hedge_delay` seconds to cut
+        # tail latency; off by default since slow periods double request count
+        self.enable_hedging = enable_hedging
+        self.hedge_delay = hedge_delay
+        self._semaphore: Optional[asyncio.Semaphore] = None
 
     # -------------------------------
-    # 🔹 LLM Call with structured response & retries
+    # 🔹 Embeddings (semantic cache + local clustering)
     # -------------------------------
-    def _make_llm_call(
-        self, prompt: str, response_model, max_retries: int = 3
-    ) -> Optional[BaseModel]:
-        for attempt in range(max_retries):
+    async def _embed_many(self, texts: List[str]) -> Optional[np.ndarray]:
+        keys = [EmbeddingCache.make_key(self.EMBEDDING_MODEL, t) for t in texts]
+        cached = self.embed_cache.get_many(keys) if self.embed_cache is not None else {}
+        missing = list(dict.fromkeys(t for t, k in zip(texts, keys) if k not in cached))
+
+        if missing:
             try:
-                response = self.client.responses.parse(
-                    model="gpt-4o-2024-08-06",
-                    input=[
-                        {
-                            "role": "system",
-                            "content": "You are a professional content strategist who writes structured, insightful briefs."
-                        },
-                        {"role": "user", "content": prompt}
-                    ],
-                    text_format=response_model,
+                response = await self.client.embeddings.create(
+                    model=self.EMBEDDING_MODEL, input=missing
                 )
-                parsed = getattr(response, "output_parsed", None)
-                if parsed is not None:
-                    return parsed
-                logger.warning(f"Retry {attempt + 1}/{max_retries}: empty or invalid LLM output")
             except Exception as e:
-                logger.warning(f"Retry {attempt + 1}/{max_retries}: API error - {e}")
-        logger.error("Failed to generate brief after all retries")
-        return None
+                logger.warning(f"Embedding failed: {e}")
+                return None
+            fresh = [
+                (EmbeddingCache.make_key(self.EMBEDDING_MODEL, t), np.asarray(d.embedding, dtype=np.float32))
+                for t, d in zip(missing, response.data)
+            ]
+            cached.update(fresh)
+            if self.embed_cache is not None:
+                self.embed_cache.put_many((k, self.EMBEDDING_MODEL, v) for k, v in fresh)
+
+        return np.vstack([cached[k] for k in keys])
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        vectors = await self._embed_many([text])
+        return vectors[0] if vectors is not None else None
+
+    @staticmethod
+    def _log_cached_tokens(response) -> None:
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "input_tokens_details", None)
+        if details is not None:
+            logger.info(
+                f"Prompt cache: {details.cached_tokens}/{usage.input_tokens} input tokens cached"
+            )
+
+    async def _stream_parse(self, prompt: str, response_model, system_prompt: str):
+        """
+        Stream the structured response so the body is consumed as it
+        arrives, bailing out as soon as the API reports an error.
+        """
+        async with self.client.responses.stream(
+            model=self.MODEL,
+            input=self._build_input(prompt, system_prompt),
+            text={"format": _text_format(response_model)},
+        ) as stream:
+            received = 0
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    received += len(event.delta)
+                elif event.type == "error":
+                    raise RuntimeError(f"Stream error: {event.message}")
+                elif event.type == "response.failed":
+                    raise RuntimeError(f"Response failed: {event.response.error}")
+            logger.debug(f"Streamed {received} chars of structured output")
+            return await stream.get_final_response()
+
+    async def _hedged_stream_parse(self, prompt: str, response_model, system_prompt: str):
+        """Return the first successful response of a primary and a delayed hedge request."""
+        primary = asyncio.create_task(self._stream_parse(prompt, response_model, system_prompt))
+        pending = {primary}
+        error: Optional[BaseException] = None
+        # Everything after the first task starts is covered, so a cancelled
+        # caller never leaves a paid request streaming in the background
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_delay)
+            if done:
+                return primary.result()
+
+            logger.info(f"No response after {self.hedge_delay}s, sending hedge request")
+            hedge = asyncio.create_task(self._stream_parse(prompt, response_model, system_prompt))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    # -------------------------------
+    # 🔹 LLM Call with structured response
+    # -------------------------------
+    async def _make_llm_call(
+        self, prompt: str, response_model,
+        cache_text: Optional[str] = None, system_prompt: str = SYSTEM_PROMPT
+    ) -> Optional[BaseModel]:
+        """
+        `cache_text` is a compact description of the request used for the
+        semantic cache tier; when omitted only exact-match caching applies.
+        """
+        exact_key = embedding = None
+        namespace = response_model.__name__
+        if self.cache is not None:
+            exact_key = LLMCache.make_key(system_prompt + prompt, self.MODEL, namespace)
+            cached = self.cache.get_exact(exact_key)
+            if cached is not None:
+                logger.info("Exact cache hit for brief generation")
+                return response_model.model_validate_json(cached)
+
+            if cache_text:
+                embedding = await self._embed(cache_text)
+                if embedding is not None:
+                    cached = self.cache.get_semantic(namespace, embedding)
+                    if cached is not None:
+                        return response_model.model_validate_json(cached)
+            self.cache.record_miss()
+
+        try:
+            if self.enable_hedging:
+                response = await self._hedged_stream_parse(prompt, response_model, system_prompt)
+            else:
+                response = await self._stream_parse(prompt, response_model, system_prompt)
+        except Exception as e:
+            # The SDK has already retried anything retryable by this point
+            logger.error(f"LLM call failed - {e}")
+            return None
+
+        self._log_cached_tokens(response)
+        output_text = getattr(response, "output_text", None)
+        if not output_text:
+            logger.error("Empty LLM output")
+            return None
+        try:
+            parsed = response_model.model_validate_json(output_text)
+        except ValidationError as e:
+            logger.error(f"Invalid LLM output - {e}")
+            return None
+        if self.cache is not None:
+            self.cache.set(exact_key, namespace, parsed.model_dump_json(), embedding)
+        return parsed
+
+    # -------------------------------
+    # 🔹 Prompt construction
+    # -------------------------------
+    @staticmethod
+    def _build_input(prompt: str, system_prompt: str = SYSTEM_PROMPT) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ]
+
+    @staticmethod
+    def _build_prompt(topics: List[str], source_type: str, priority: str) -> str:
+        # Sorted so the same topic set always yields a byte-identical prompt
+        topics_block = "\n".join(f"- {t}" for t in sorted(topics))
+        return USER_PROMPT_TEMPLATE.format(
+            topics_block=topics_block, source_type=source_type, priority=priority
+        )
 
     # -------------------------------
     # 🔹 Generate grouped briefs for a list of topics
     # -------------------------------
-    def _generate_briefs_for_group(
+    async def _generate_briefs_for_group(
         self, topics: List[str], source_type: str, priority: str
     ) -> List[Dict[str, Any]]:
         if not topics:
             return []
 
-        prompt = f"""
-You are a senior content strategist specializing in deep-tech storytelling.
+        if self.cluster_locally:
+            embeddings = await self._embed_many(topics)
+            if embeddings is not None:
+                kept, embeddings = semantic_dedupe(topics, embeddings)
+                if len(kept) < len(topics):
+                    logger.info(f"Dropped {len(topics) - len(kept)} near-duplicate {source_type} topics")
+                topics = kept
+
+                # Reuse earlier clusters still fully present; only leftovers get clustered
+                reused: List[Dict[str, Any]] = []
+                if self.fragment_cache is not None:
+                    reused, leftover = self.fragment_cache.reuse(topics, source_type, priority)
+                    if reused:
+                        logger.info(f"Reused {len(reused)} cached {source_type} briefs covering "
+                                    f"{len(topics) - len(leftover)} topics")
+                        keep = set(leftover)
+                        embeddings = embeddings[[i for i, t in enumerate(topics) if t in keep]]
+                        topics = leftover
+                if not topics:
+                    return reused
+
+                if len(topics) >= CPU_POOL_MIN_TOPICS:
+                    loop = asyncio.get_running_loop()
+                    clusters = await loop.run_in_executor(
+                        cpu_pool(), cluster_topics, topics, embeddings
+                    )
+                else:
+                    clusters = cluster_topics(topics, embeddings)
+                logger.info(f"Clustered {len(topics)} {source_type} topics into {len(clusters)} groups locally")
+                results = await asyncio.gather(
+                    *(self._generate_single_brief(c, source_type, priority) for c in clusters)
+                )
+                fresh = [(cluster, brief) for cluster, brief in zip(clusters, results) if brief is not None]
+                if self.fragment_cache is not None:
+                    self.fragment_cache.put_many(
+                        (cluster, source_type, priority, brief) for cluster, brief in fresh
+                    )
+                return reused + [brief for _, brief in fresh]
+            logger.warning("Local clustering unavailable, falling back to a single LLM call")
 
-Your task is to translate highly technical AI topics into structured, marketing-ready content briefs for a non-engineering marketing team.
+        prompt = self._build_prompt(topics, source_type, priority)
 
-### INSTRUCTIONS
-1. Group the topics into **3–7 logical, insight-driven clusters** based on real technical relationships.
-2. For each cluster, create **one structured content brief**.
-3. The briefs must NOT be generic. Each point should:
-   - reflect the true technical meaning of the topics,
-   - help a marketing team understand why the topic matters,
-   - provide angles that can be used for campaign planning, messaging, or content creation.
+        # print(prompt)  # For debugging
 
-### Each brief must include:
-- **audience** (who this content is for)
-- **job_to_be_done** (what the marketer should accomplish with this content)
-- **angle** (the narrative POV that makes the topic meaningful)
-- **promise** (what the audience gains from this content)
-- **cta** (the action we want readers to take)
-- **key_talking_points** (3–6 *specific, non-generic* insights that explain the topic clearly to non-technical stakeholders)
+        cache_text = f"{source_type} | {priority} | " + "; ".join(sorted(topics))
+        result = await self._make_llm_call(
+            prompt, response_model=BriefList, cache_text=cache_text
+        )
+        if result is None:
+            logger.error(f"Failed to generate structured briefs for {source_type}")
+            return []
 
-### Topics:
-{chr(10).join(f"- {t}" for t in topics)}
+        return _BRIEF_LIST_ADAPTER.dump_python(result.briefs)
 
-Source Type: {source_type}
-Priority: {priority}
 
-### OUTPUT FORMAT
-Return a **single JSON object** with key `"briefs"`, whose value is a list of briefs.
-Do NOT include extra commentary. Only return the JSON.
-"""
+    async def _generate_single_brief(
+        self, topics: List[str], source_type: str, priority: str
+    ) -> Optional[Dict[str, Any]]:
+        """Generate one brief for a pre-clustered group of topics."""
+        prompt = self._build_prompt(topics, source_type, priority)
+        cache_text = f"{source_type} | {priority} | " + "; ".join(sorted(topics))
+        async with self._semaphore:
+            result = await self._make_llm_call(
+                prompt,
+                response_model=BriefItem,
+                cache_text=cache_text,
+                system_prompt=SINGLE_BRIEF_SYSTEM_PROMPT,
+            )
+        if result is None:
+            logger.error(f"Failed to generate brief for {source_type} cluster: {topics}")
+            return None
 
+        brief = result.model_dump()
+        brief["source_type"] = source_type
+        brief["priority"] = priority
+        return brief
 
-        # print(prompt)  # For debugging
+    # -------------------------------
+    # 🔹 Batch API (offline, ~50% cheaper, up to 24h turnaround)
+    # -------------------------------
+    def _build_batch_request(
+        self, custom_id: str, topics: List[str], source_type: str, priority: str
+    ) -> Dict[str, Any]:
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/responses",
+            "body": {
+                "model": self.MODEL,
+                "input": self._build_input(self._build_prompt(topics, source_type, priority)),
+                "text": {"format": _text_format(BriefList)},
+            },
+        }
+
+    @staticmethod
+    def _extract_output_text(body: Dict[str, Any]) -> Optional[str]:
+        for item in body.get("output", []):
+            if item.get("type") != "message":
+                continue
+            for part in item.get("content", []):
+                if part.get("type") == "output_text":
+                    return part.get("text")
+        return None
 
-        result = self._make_llm_call(prompt, response_model=BriefList)
-        if result is None:
-            logger.error(f"Failed to generate structured briefs for {source_type}")
-            return []
+    async def _generate_briefs_batch(
+        self, groups: List[tuple]
+    ) -> List[List[Dict[str, Any]]]:
+        """Submit each (topics, source_type, priority) group as one batch line."""
+        custom_ids = [source_type.lower().replace(" ", "_") for _, source_type, _ in groups]
+        requests = [
+            self._build_batch_request(custom_id, topics, source_type, priority)
+            for custom_id, (topics, source_type, priority) in zip(custom_ids, groups)
+            if topics
+        ]
+        if not requests:
+            return [[] for _ in groups]
 
-        return [b.model_dump() for b in result.briefs]
+        payload = "\n".join(json.dumps(r, ensure_ascii=False) for r in requests)
+        input_file = await self.client.files.create(
+            file=("content_briefs_batch.jsonl", payload.encode("utf-8")),
+            purpose="batch",
+        )
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/responses",
+            completion_window="24h",
+        )
+        logger.info(f"Submitted brief batch {batch.id} with {len(requests)} requests")
+
+        attempt = 0
+        while batch.status not in self.BATCH_TERMINAL_STATUSES:
+            await asyncio.sleep(min(self.BATCH_POLL_CAP, self.BATCH_POLL_BASE * 2 ** attempt))
+            attempt += 1
+            batch = await self.client.batches.retrieve(batch.id)
+            logger.info(f"Batch {batch.id} status: {batch.status}")
+
+        if batch.status != "completed" or not batch.output_file_id:
+            logger.error(f"Brief batch {batch.id} ended with status {batch.status}")
+            return [[] for _ in groups]
+
+        output = await self.client.files.content(batch.output_file_id)
+        briefs_by_id: Dict[str, List[Dict[str, Any]]] = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                logger.error(f"Skipping unreadable batch output line: {e}")
+                continue
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                logger.error(f"Batch request {record.get('custom_id')} failed: {record.get('error')}")
+                continue
+            text = self._extract_output_text(response.get("body", {}))
+            if text is None:
+                logger.error(f"Batch request {record.get('custom_id')} returned no output text")
+                continue
+            # A 200 can still carry a truncated (incomplete) or off-schema body
+            try:
+                parsed = BriefList.model_validate_json(text)
+            except (ValueError, ValidationError) as e:
+                logger.error(f"Batch request {record.get('custom_id')} returned invalid briefs: {e}")
+                continue
+            briefs_by_id[record["custom_id"]] = _BRIEF_LIST_ADAPTER.dump_python(parsed.briefs)
 
+        return [briefs_by_id.get(custom_id, []) for custom_id in custom_ids]
 
     # -------------------------------
     # 🔹 Main entry point
     # -------------------------------
     def generate_content_briefs(
-        self, content_gaps: List[Dict[str, Any]], trending_data: Dict[str, Any]
+        self,
+        content_gaps: List[Dict[str, Any]],
+        trending_data: Dict[str, Any],
+        mode: Literal["sync", "batch"] = "sync",
     ) -> List[Dict[str, Any]]:
-        # Extract topics
-        content_gap_topics = [t["gap_topic"] for t in content_gaps]
-        trending_topics = [
-            t["topic_cluster"]
-            for t in trending_data.get("trending_topics", [])
-            if t.get("relevance_score", 0)
-            >= trending_data.get("elbow_threshold", 0)
-        ]
-
-        # Generate for Content Gaps
-        logger.info("Generating grouped briefs for Content Gaps...")
-        gap_briefs = self._generate_briefs_for_group(
-            content_gap_topics, source_type="Content Gap", priority="High"
+        """Sync wrapper around the async implementation for existing callers."""
+        return asyncio.run(
+            self._generate_content_briefs_async(content_gaps, trending_data, mode=mode)
         )
 
-        # Generate for Trending Topics
-        logger.info("Generating grouped briefs for Trending Topics...")
-        trend_briefs = self._generate_briefs_for_group(
-            trending_topics, source_type="Trending Topic", priority="Medium"
-        )
+    async def _generate_content_briefs_async(
+        self,
+        content_gaps: List[Dict[str, Any]],
+        trending_data: Dict[str, Any],
+        mode: Literal["sync", "batch"] = "sync",
+    ) -> List[Dict[str, Any]]:
+        from openai_http import async_http_client
+
+        if mode not in ("sync", "batch"):
+            raise ValueError(f"Unknown generation mode: {mode}")
+        # Created per run: each asyncio.run() call gets a fresh event loop, and
+        # neither a semaphore nor pooled async connections can cross loops
+        self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_CALLS)
+        template = self.client
+        self.client = template.with_options(http_client=async_http_client())
+        try:
+            return await self._generate_all(content_gaps, trending_data, mode)
+        finally:
+            await self.client.close()
+            self.client = template
+
+    async def _generate_all(
+        self,
+        content_gaps: List[Dict[str, Any]],
+        trending_data: Dict[str, Any],
+        mode: Literal["sync", "batch"],
+    ) -> List[Dict[str, Any]]:
+        # Extract, normalize and dedupe topics
+        threshold = trending_data.get("elbow_threshold", 0)
+        content_gap_topics = dedupe_topics([t["gap_topic"] for t in content_gaps])
+        trending_topics = dedupe_topics([
+            t["topic_cluster"]
+            for t in trending_data.get("trending_topics", ())
+            if t.get("relevance_score", 0) >= threshold
+        ])
+        # Empty groups are dropped here so no call, embedding or batch line is made for them
+        groups = [
+            group for group in (
+                (content_gap_topics, "Content Gap", "High"),
+                (trending_topics, "Trending Topic", "Medium"),
+            )
+            if group[0]
+        ]
+        if not groups:
+            logger.warning("No topics to generate briefs for.")
+            return []
 
-        all_briefs = gap_briefs + trend_briefs
+        if mode == "batch":
+            logger.info("Submitting grouped briefs via the Batch API...")
+            results = await self._generate_briefs_batch(groups)
+        else:
+            # Groups are independent, so fire their LLM calls concurrently
+            logger.info(f"Generating grouped briefs for: {', '.join(g[1] for g in groups)}...")
+            results = await asyncio.gather(
+                *(self._generate_briefs_for_group(topics, source_type, priority)
+                  for topics, source_type, priority in groups)
+            )
+
+        all_briefs = [brief for group_briefs in results for brief in group_briefs]
         logger.info(f"✅ Generated {len(all_briefs)} structured content briefs in total.")
+        if self.cache is not None:
+            logger.info(f"LLM cache stats: {self.cache.stats}")
+        if self.embed_cache is not None:
+            logger.info(f"Embedding cache stats: {self.embed_cache.stats}")
+        if self.fragment_cache is not None:
+            logger.info(f"Brief fragment cache stats: {self.fragment_cache.stats}")
         return all_briefs
 
 
@@ -154,7 +701,9 @@ Do NOT include extra commentary. Only return the JSON.
 # 🧪 Example usage
 # ==========================================================
 if __name__ == "__main__":
-    import json
+    from dotenv import load_dotenv
+
+    load_dotenv()
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
     trending_input = {
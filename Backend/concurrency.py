@@ -0,0 +1,112 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return max(1, int(value))
+    except ValueError:
+        logger.warning(f"Ignoring non-integer {name}={value!r}; using {default}")
+        return default
+
+
+# ==========================================================
+# ⚙️ Concurrency Limits
+# ==========================================================
+@dataclass(frozen=True)
+class ConcurrencyConfig:
+    """
+    Every fan-out limit in the pipeline, resolved once at import time.
+
+    Recommended values (the defaults) for a small 2-4 core host:
+      SCRAPE_TOTAL=50        open HTTP connections across all sites
+      SCRAPE_PER_HOST=8      connections to any single site (be polite)
+      SITE_CONCURRENCY=8     sites crawled at once (bounds pages held in memory)
+      GAP_QUEUE_SIZE=8       scraped competitors waiting for gap analysis
+      GAP_LLM_CONCURRENCY=16 in-flight gap-analysis LLM calls
+      REDDIT_CONCURRENCY=10  in-flight Reddit API requests
+      CPU_WORKERS=2          processes for CPU-bound clustering
+      PARSE_WORKERS=<cores>  processes for parsing scraped page HTML
+    """
+    scrape_total: int = 50
+    scrape_per_host: int = 8
+    sites: int = 8
+    gap_queue: int = 8
+    gap_llm: int = 16
+    reddit: int = 10
+    cpu_workers: int = 2
+    parse_workers: int = os.cpu_count() or 1
+
+    @classmethod
+    def from_env(cls) -> "ConcurrencyConfig":
+        cpus = os.cpu_count() or 1
+        return cls(
+            # Past ~8 sockets per core the event loop itself becomes the bottleneck
+            scrape_total=min(_env_int("SCRAPE_TOTAL", cls.scrape_total), 8 * cpus),
+            scrape_per_host=_env_int("SCRAPE_PER_HOST", cls.scrape_per_host),
+            sites=_env_int("SITE_CONCURRENCY", cls.sites),
+            gap_queue=_env_int("GAP_QUEUE_SIZE", cls.gap_queue),
+            gap_llm=_env_int("GAP_LLM_CONCURRENCY", cls.gap_llm),
+            reddit=_env_int("REDDIT_CONCURRENCY", cls.reddit),
+            cpu_workers=min(_env_int("CPU_WORKERS", cls.cpu_workers), cpus),
+            parse_workers=min(_env_int("PARSE_WORKERS", cls.parse_workers), cpus),
+        )
+
+
+config = ConcurrencyConfig.from_env()
+
+
+# ==========================================================
+# 🧮 Shared Process Pools
+# ==========================================================
+_cpu_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _mp_context():
+    # Pools start lazily from inside a threaded process (to_thread pipeline
+    # runs, the progress renderer, HTTP clients, sqlite connections); a
+    # forked child can inherit a lock some other thread held and deadlock
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def cpu_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for CPU-bound steps (clustering sweeps, large scoring passes),
+    created on first use and shared so the pipeline never runs more than
+    config.cpu_workers such processes.
+    """
+    global _cpu_pool
+    with _pool_lock:
+        if _cpu_pool is None:
+            _cpu_pool = ProcessPoolExecutor(max_workers=config.cpu_workers, mp_context=_mp_context())
+        return _cpu_pool
+
+
+def parse_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for parsing scraped pages, separate from cpu_pool() so a
+    long clustering job never stalls page parsing (and vice versa); one
+    worker per core unless PARSE_WORKERS says otherwise.
+    """
+    global _parse_pool
+    with _pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(max_workers=config.parse_workers, mp_context=_mp_context())
+        return _parse_pool
@@ -1,80 +1,152 @@
 
-import json
-from datetime import datetime, time
+from datetime import date, datetime, timedelta
 import os
+import sys
 from dotenv import load_dotenv
 import asyncio
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
-from functools import partial
-# import time
-from typing import Dict, List, Any
+from functools import lru_cache
+import time
+from typing import Dict, List, Any, Optional
 import threading
+from collections import Counter
 
-from sitemap_agent import WebScraper
-from social_trend_miner import RedditTrendMiner
-from gap_analyzer import ContentGapFinder
+import aiohttp
+
+from sitemap_agent import Page, WebScraper
+from social_trend_miner import AsyncRedditTrendMiner
+from gap_analyzer import ContentGapFinder, dedupe_titles, title_set
 from trend_clusterer import TrendAnalyzer
 from brief_generator import ContentBriefGenerator
+from artifacts import (intermediate_path, open_artifact, pack_array, packer, write_json,
+                       write_msgpack, write_msgpack_list)
+from concurrency import config
+from llm_cache import cached_stage
+from openai_http import warm_up, warm_up_async
+from scrape_cache import ScrapeCache
 
 # -----------------------------
 # Progress Tracker
 # -----------------------------
 class ProgressTracker:
-    def __init__(self):
-        self.lock = threading.Lock()
+    _RULE = "=" * 70
+    _BAR_LUT = tuple("█" * i + "░" * (20 - i) for i in range(21))
+    _STATUS_ICONS = {"completed": "✅", "running": "⏳"}
+    
+    def __init__(self, render_interval: float = 0.25, in_place: Optional[bool] = None):
+        self.lock = threading.RLock()
         self.phases = {
-            "sitemap_scraping": {"total": 0, "completed": 0, "status": "pending"},
-            "social_mining": {"total": 0, "completed": 0, "status": "pending"},
-            "trend_analysis": {"total": 0, "completed": 0, "status": "pending"},
-            "gap_analysis": {"total": 0, "completed": 0, "status": "pending"},
-            "brief_generation": {"total": 0, "completed": 0, "status": "pending"}
+            "sitemap_scraping": {"total": 0, "status": "pending"},
+            "social_mining": {"total": 0, "status": "pending"},
+            "trend_analysis": {"total": 0, "status": "pending"},
+            "gap_analysis": {"total": 0, "status": "pending"},
+            "brief_generation": {"total": 0, "status": "pending"}
         }
-        self.start_time = datetime.now()
+        # Hot path: each thread bumps its own Counter shard, so increment()
+        # needs no lock, no shared atomic and no print. Readers sum the shards;
+        # update(completed=...) moves a per-phase offset instead of writing
+        # into shards other threads own.
+        self._local = threading.local()
+        self._shards: List[Counter] = []
+        self._offsets: Dict[str, int] = {}
+        self.start_ns = time.monotonic_ns()
+        
+        # Display runs on its own thread, off the writers' path
+        self.render_interval = render_interval
+        # On a terminal, redraw the block over itself instead of appending a new one
+        self.in_place = sys.stdout.isatty() if in_place is None else in_place
+        self._drawn_lines = 0
+        self._renderer_thread = None
+        self._stop = threading.Event()
+    
+    def _shard(self) -> Counter:
+        try:
+            return self._local.counts
+        except AttributeError:
+            counts = self._local.counts = Counter()
+            with self.lock:
+                self._shards.append(counts)
+            return counts
+    
+    def _counted(self, phase: str) -> int:
+        return sum(shard[phase] for shard in tuple(self._shards))
+    
+    def completed(self, phase: str) -> int:
+        return self._offsets.get(phase, 0) + self._counted(phase)
+    
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                phase: {"total": data["total"], "completed": self.completed(phase), "status": data["status"]}
+                for phase, data in self.phases.items()
+            }
     
     def update(self, phase: str, completed: int = None, total: int = None, status: str = None):
         with self.lock:
             if total is not None:
                 self.phases[phase]["total"] = total
             if completed is not None:
-                self.phases[phase]["completed"] = completed
+                self._offsets[phase] = completed - self._counted(phase)
             if status is not None:
                 self.phases[phase]["status"] = status
-            self._print_progress()
+        self._ensure_renderer()
     
     def increment(self, phase: str):
+        self._shard()[phase] += 1
+    
+    def stop(self):
+        """Stop the renderer after printing the final state (the next update() restarts it)."""
+        with self.lock:
+            thread, self._renderer_thread = self._renderer_thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+            self._stop.clear()
+        # Whatever is printed next starts below the final block
+        self._drawn_lines = 0
+    
+    def _ensure_renderer(self):
+        if self._renderer_thread is not None:
+            return
         with self.lock:
-            self.phases[phase]["completed"] += 1
-            self._print_progress()
+            if self._renderer_thread is None:
+                self._renderer_thread = threading.Thread(
+                    target=self._renderer, name="progress-renderer", daemon=True
+                )
+                self._renderer_thread.start()
     
-    # def _print_progress(self):
-    #     elapsed = datetime.now() - self.start_time
-    #     print(f"\n{'='*70}")
-    #     print(f"⏱️  Elapsed Time: {elapsed:.1f}s")
-    #     print(f"{'='*70}")
-    #     for phase, data in self.phases.items():
-    #         status_icon = "✅" if data["status"] == "completed" else "⏳" if data["status"] == "running" else "⏸️"
-    #         if data["total"] > 0:
-    #             pct = (data["completed"] / data["total"]) * 100
-    #             bar = "█" * int(pct / 5) + "░" * (20 - int(pct / 5))
-    #             print(f"{status_icon} {phase:20s} [{bar}] {data['completed']}/{data['total']} ({pct:.0f}%)")
-    #         else:
-    #             print(f"{status_icon} {phase:20s} [{data['status']}]")
-    #     print(f"{'='*70}\n")
+    def _renderer(self):
+        last = None
+        while True:
+            stopping = self._stop.wait(self.render_interval)
+            current = self.snapshot()
+            if current != last:
+                self._render(current)
+                last = current
+            if stopping:
+                return
     
-    def _print_progress(self):
-        elapsed = (datetime.now() - self.start_time).total_seconds()
-        print(f"\n{'='*70}")
-        print(f"⏱️  Elapsed Time: {elapsed:.1f}s")
-        print(f"{'='*70}")
-        for phase, data in self.phases.items():
-            status_icon = "✅" if data["status"] == "completed" else "⏳" if data["status"] == "running" else "⏸️"
+    def _render(self, snapshot: dict):
+        elapsed = (time.monotonic_ns() - self.start_ns) / 1e9
+        lines = ["", self._RULE, f"⏱️  Elapsed Time: {elapsed:.1f}s", self._RULE]
+        for phase, data in snapshot.items():
+            status_icon = self._STATUS_ICONS.get(data["status"], "⏸️")
             if data["total"] > 0:
                 pct = (data["completed"] / data["total"]) * 100
-                bar = "█" * int(pct / 5) + "░" * (20 - int(pct / 5))
-                print(f"{status_icon} {phase:20s} [{bar}] {data['completed']}/{data['total']} ({pct:.0f}%)")
+                bar = self._BAR_LUT[min(20, int(pct // 5))]
+                lines.append(f"{status_icon} {phase:20s} [{bar}] {data['completed']}/{data['total']} ({pct:.0f}%)")
             else:
-                print(f"{status_icon} {phase:20s} [{data['status']}]")
-        print(f"{'='*70}\n")
+                lines.append(f"{status_icon} {phase:20s} [{data['status']}]")
+        lines.append(self._RULE)
+        block = "\n".join(lines) + "\n"
+        if self.in_place:
+            # Cursor up to the previous block's first line, then clear to end of screen
+            if self._drawn_lines:
+                block = f"\x1b[{self._drawn_lines}F\x1b[J" + block
+            self._drawn_lines = len(lines)
+        else:
+            block += "\n"
+        sys.stdout.write(block)
+        sys.stdout.flush()
 
 # -----------------------------
 # Load Environment Variables
@@ -89,22 +161,121 @@ os.makedirs("data", exist_ok=True)
 
 # Initialize progress tracker
 tracker = ProgressTracker()
+# Same-day re-runs reuse finished crawls; SCRAPE_CACHE_TTL=0 turns this off
+scrape_cache = ScrapeCache(ttl_seconds=float(os.getenv("SCRAPE_CACHE_TTL", 24 * 3600)))
+
+# -----------------------------
+# Artifact Output
+# -----------------------------
+SITEMAPS_PATH = intermediate_path("sitemaps_data")
+SOCIAL_RAW_PATH = intermediate_path("social_trends_raw")
+TRENDS_REPORT_PATH = intermediate_path("trending_topics_report")
+GAPS_REPORT_PATH = intermediate_path("content_gaps_report")
+# Final, human-facing output stays JSON
+BRIEFS_PATH = "data/content_briefs.json"
+
+
+def stream_sitemap(path: str, our_details: List[Page], competitors_map: Dict[str, List[Page]]):
+    """Write the sitemap artifact page by page; never holds the whole encoded document."""
+    p = packer()
+    with open_artifact(path) as f:
+        f.write(p.pack_map_header(2))
+        f.write(p.pack("our_pages"))
+        pack_array(f, p, (page.to_dict() for page in our_details), len(our_details))
+        f.write(p.pack("competitor_pages"))
+        f.write(p.pack_map_header(len(competitors_map)))
+        for comp_url, pages in competitors_map.items():
+            f.write(p.pack(comp_url))
+            pack_array(f, p, (page.to_dict() for page in pages), len(pages))
+
+
+# Strong references so background writes aren't garbage-collected mid-flight
+_pending_writes = set()
+
+
+def fire_and_forget(writer, *args):
+    """Schedule a blocking writer on a worker thread without blocking the running loop."""
+    task = asyncio.create_task(asyncio.to_thread(writer, *args))
+    _pending_writes.add(task)
+    task.add_done_callback(_pending_writes.discard)
+
+
+def fire_and_forget_write(path: str, obj: Any):
+    fire_and_forget(write_msgpack, path, obj)
+
+
+async def flush_pending_writes():
+    """Wait for every scheduled background write (call before the loop exits)."""
+    results = await asyncio.gather(*_pending_writes, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"❌ Error saving artifact: {result}")
+
+
+# -----------------------------
+# Shared HTTP Session
+# -----------------------------
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Return the process-wide keep-alive session, creating it on the running loop if needed."""
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = aiohttp.TCPConnector(
+            limit=config.scrape_total,
+            limit_per_host=config.scrape_per_host,
+            ttl_dns_cache=WebScraper.DNS_CACHE_TTL,
+            keepalive_timeout=WebScraper.KEEPALIVE_TIMEOUT
+        )
+        _session = aiohttp.ClientSession(connector=connector)
+        _session_loop = loop
+    return _session
+
+
+async def close_session():
+    """Close the shared session (call before the owning event loop exits)."""
+    global _session, _session_loop
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = _session_loop = None
+
 
 # -----------------------------
 # Helper Functions
 # -----------------------------
-def scrape_site(url: str, scraper: WebScraper, keywords: List[str], start_date:str, end_date:str, is_own: bool = False) -> tuple:
+async def bounded(limit: asyncio.Semaphore, coro):
+    """Await coro only while holding a slot in limit."""
+    async with limit:
+        return await coro
+
+
+async def scrape_site(url: str, scraper: WebScraper, keywords: List[str], start_date:str, end_date:str, is_own: bool = False) -> tuple:
     """Scrape a single site (own or competitor)"""
     try:
         site_type = "own site" if is_own else "competitor"
         print(f"🔍 Starting scrape: {url} ({site_type})")
         
-        details = scraper.scrape(
+        cache_key = ScrapeCache.make_key(url, start_date, end_date, keywords,
+                                         scraper.max_pages, scraper.max_depth)
+        details = await asyncio.to_thread(scrape_cache.get, cache_key)
+        if details is not None:
+            print(f"✅ Completed scrape: {url} ({len(details)} pages, cached)")
+            tracker.increment("sitemap_scraping")
+            return (url, details, None)
+        
+        details = await scraper.scrape_async(
             homepage_url=url,
             start_date=start_date,
             end_date=end_date,
-            keywords=keywords
+            keywords=keywords,
+            session=await get_session()
         )
+        # An empty crawl may just be a transient failure, so only keep real results
+        if details:
+            await asyncio.to_thread(scrape_cache.set, cache_key, details)
         
         print(f"✅ Completed scrape: {url} ({len(details)} pages)")
         tracker.increment("sitemap_scraping")
@@ -116,249 +287,262 @@ def scrape_site(url: str, scraper: WebScraper, keywords: List[str], start_date:s
         return (url, [], str(e))
 
 
-def analyze_gap_for_competitor(comp_url: str, comp_pages: List[Dict], 
-                               own_titles: List[str], api_key: str) -> List[Dict]:
-    """Analyze content gaps for a single competitor"""
+async def mine_social_trends(keywords: List[str], start_date, end_date) -> List[Dict]:
+    """Mine social trends over the shared aiohttp session (Reddit REST API, no PRAW threads)."""
     try:
-        print(f"⚙️  Finding content gaps vs {comp_url}")
-        finder = ContentGapFinder(api_key=api_key)
-        comp_titles = [page['title'] for page in comp_pages]
+        tracker.update("social_mining", status="running")
+        print("🔍 Starting social trend mining...")
+        
+        miner = AsyncRedditTrendMiner(
+            client_id=client_id,
+            client_secret=client_secret,
+            user_agent=user_agent,
+            max_concurrent=config.reddit
+        )
         
-        gaps = finder.find_gaps(own_titles, comp_titles)
-        for g in gaps:
-            g["competitor"] = comp_url
+        keywords_social = keywords if keywords else ["AI", "artificial intelligence", "machine learning", "deep learning"]
         
-        print(f"✅ Found {len(gaps)} gaps for {comp_url}")
-        tracker.increment("gap_analysis")
+        social_data = await miner.run_async(keywords_social, start_date, end_date, 
+                                            posts_limit=50, top_subs=3,
+                                            session=await get_session())
         
-        return gaps
+        print(f"✅ Completed social mining: {len(social_data)} posts")
+        tracker.update("social_mining", completed=1, status="completed")
+        
+        return social_data
     except Exception as e:
-        print(f"❌ Error analyzing gaps for {comp_url}: {str(e)}")
-        tracker.increment("gap_analysis")
+        print(f"❌ Error in social mining: {str(e)}")
+        tracker.update("social_mining", completed=1, status="completed")
+        return []
+
+
+async def analyze_gaps_for_competitors_async(all_competitor_details: Dict[str, List[Page]],
+                                            own_titles: List[str], finder: ContentGapFinder,
+                                            own_title_set: frozenset = None) -> List[Dict]:
+    """Analyze content gaps for all competitors in one batched LLM call"""
+    try:
+        print(f"⚙️  Finding content gaps vs {len(all_competitor_details)} competitors")
+        # Duplicate titles only inflate prompt tokens
+        titles_by_competitor = {
+            comp_url: dedupe_titles([page.title for page in comp_pages])
+            for comp_url, comp_pages in all_competitor_details.items()
+        }
+        
+        gaps_by_competitor = await finder.find_gaps_batch_async(own_titles, titles_by_competitor, own_title_set)
+        
+        content_gaps = []
+        for comp_url, gaps in gaps_by_competitor.items():
+            for g in gaps:
+                g["competitor"] = comp_url
+            content_gaps.extend(gaps)
+            print(f"✅ Found {len(gaps)} gaps for {comp_url}")
+            tracker.increment("gap_analysis")
+        
+        return content_gaps
+    except Exception as e:
+        print(f"❌ Error analyzing gaps: {str(e)}")
+        for _ in all_competitor_details:
+            tracker.increment("gap_analysis")
         return []
 
 
 # -----------------------------
-# PHASE 1 & 2: PARALLEL DATA COLLECTION
+# PHASES 1-4: SETUP
 # -----------------------------
-def run_phase_1_and_2_parallel(our_url: str = "https://www.aicerts.ai/", 
-                               competitors: List[str] = None,
-                               keywords: List[str] = None):
-    """Run sitemap scraping and social mining in parallel"""
-    
-    print("\n" + "="*70)
-    print("🚀 PHASE 1 & 2: PARALLEL DATA COLLECTION")
-    print("="*70)
-    from datetime import datetime, timedelta
-    # yesterday = datetime.now() - timedelta(days=1)
-    # yesterday_str = yesterday.strftime("%Y-%m-%d")
-
-    # Calculate date range
-    yesterday = datetime.now() - timedelta(days=1)
+@lru_cache(maxsize=1)
+def _date_windows(today: date) -> tuple:
+    """Own/competitor/social date windows for ``today``, formatted once per calendar day."""
+    yesterday = today - timedelta(days=1)
     yesterday_str = yesterday.strftime("%Y-%m-%d")
 
     # Our site → last 30 days
-    start_30_days = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
-    end_today = yesterday.strftime("%Y-%m-%d")
+    start_30_days = (today - timedelta(days=30)).strftime("%Y-%m-%d")
 
     # Competitor sites → only yesterday
-    comp_start = yesterday_str
-    comp_end = yesterday_str
+    comp_range = (yesterday_str, yesterday_str)
 
+    # Social miner normalizes to whole days, so midnight is as good as now
+    social_date = datetime.combine(yesterday, datetime.min.time())
+    return (start_30_days, yesterday_str), comp_range, social_date
+
+
+def _pipeline_setup() -> tuple:
+    """Build the scraper and the own/competitor/social date windows."""
+    own_range, comp_range, yesterday = _date_windows(date.today())
 
-    # Normalize to full-day range
-    # start_date = datetime.combine(yesterday.date(), time.min)   # 00:00:00
-    # end_date = datetime.combine(yesterday.date(), time.max)     # 23:59:59
     # Setup
     scraper = WebScraper(
         delay=0.1,
         timeout=10,
         max_pages=15,
         max_depth=1,
-        max_concurrent=15
+        max_concurrent=config.scrape_total
     )
+    return scraper, own_range, comp_range, yesterday
+
+
+# -----------------------------
+# PHASES 3 & 4: ANALYSIS STEPS
+# -----------------------------
+@cached_stage("trend_report")
+def _trend_report(social_data: List[Dict]) -> Dict:
+    analyzer = TrendAnalyzer(api_key=OPENAI_API_KEY)
+    return analyzer.run_from_data(social_data, apply_elbow=True, show_plot=False)
+
+
+@cached_stage("content_briefs")
+def _content_briefs(content_gaps_combined: List[Dict], trending_input: Dict) -> List[Dict]:
+    generator = ContentBriefGenerator(api_key=OPENAI_API_KEY)
+    return generator.generate_content_briefs(content_gaps_combined, trending_input)
+
+
+def analyze_trends(social_data: List[Dict]) -> List[Dict]:
+    """Cluster social posts into trending topics (blocking)."""
+    try:
+        print("⚙️  Starting trend analysis...")
+        trending_input = _trend_report(social_data)
+        
+        print(f"✅ Completed trend analysis: {len(trending_input)} clusters")
+        tracker.update("trend_analysis", completed=1, status="completed")
+        
+        return trending_input
+    except Exception as e:
+        print(f"❌ Error in trend analysis: {str(e)}")
+        tracker.update("trend_analysis", completed=1, status="completed")
+        return []
+
+
+# -----------------------------
+# PHASES 1-4: PIPELINED
+# -----------------------------
+async def _run_phases_1_to_4(scraper: WebScraper, our_url: str, competitors: List[str],
+                             keywords: List[str], own_range: tuple, comp_range: tuple,
+                             social_date, gap_workers: int = config.gap_llm) -> tuple:
+    """
+    Producer/consumer pipeline: each competitor scrape feeds gap analysis as
+    soon as it lands, and trend analysis starts as soon as social mining ends.
+    """
+    loop = asyncio.get_running_loop()
+    finder = ContentGapFinder(api_key=OPENAI_API_KEY)
+    # Open the OpenAI connections while the scrapes run, so the first gap and
+    # trend calls skip the handshake (the sync pool is shared with TrendAnalyzer)
+    warmups = [asyncio.create_task(warm_up_async(finder.async_client)),
+               asyncio.create_task(asyncio.to_thread(warm_up, finder.client))]
+    # Bounded on both ends: scrapes wait for a site slot, and a finished scrape
+    # waits for queue space, so memory stays flat however many competitors
+    gap_queue: asyncio.Queue = asyncio.Queue(maxsize=config.gap_queue)
+    site_limit = asyncio.Semaphore(config.sites)
+    num_workers = max(1, min(gap_workers, len(competitors)))
     
-    # our_url = "https://www.aicerts.ai/"
-    # competitors = [
-    #     "https://www.mygreatlearning.com",
-    #     "https://www.coursera.org",
-    #     "https://www.udemy.com",
-    #     "https://www.simplilearn.com"
-    # ]
-    # keywords = ['course', 'certification', 'program']
+    own_task = asyncio.create_task(scrape_site(our_url, scraper, keywords, *own_range, True))
     
-    # Update progress
-    tracker.update("sitemap_scraping", total=len(competitors) + 1, completed=0, status="running")
-    tracker.update("social_mining", total=1, completed=0, status="running")
+    async def scrape_competitor(comp_url: str) -> tuple:
+        url, details, error = await bounded(
+            site_limit, scrape_site(comp_url, scraper, keywords, *comp_range, False)
+        )
+        await gap_queue.put((url, details))
+        return url, details, error
     
-    # Use ThreadPoolExecutor for I/O-bound operations
-    with ThreadPoolExecutor(max_workers=6) as executor:
-        # Submit all scraping jobs
-        future_to_url = {}
-        
-        # Submit our own site
-        future = executor.submit(scrape_site, our_url, scraper, keywords, start_30_days, yesterday_str, True)
-        future_to_url[future] = ("own", our_url)
-        
-        # Submit all competitor sites
-        for comp_url in competitors:
-            future = executor.submit(scrape_site, comp_url, scraper, keywords, yesterday_str, yesterday_str, False)
-            future_to_url[future] = ("competitor", comp_url)
-        
-        # Submit social mining job in parallel
-        def mine_social_trends():
-            try:
-                tracker.update("social_mining", status="running")
-                print("🔍 Starting social trend mining...")
-                
-                miner = RedditTrendMiner(
-                    client_id=client_id,
-                    client_secret=client_secret,
-                    user_agent=user_agent,
-                    max_workers=10
-                )
-                
-                keywords_social = keywords if keywords else ["AI", "artificial intelligence", "machine learning", "deep learning"]
-                start_date = yesterday #datetime(2025, 10, 24)
-                end_date = yesterday #datetime(2025, 10, 30)
-                
-                social_data = miner.run(keywords_social, start_date, end_date, 
-                                       posts_limit=50, top_subs=3)
-                
-                print(f"✅ Completed social mining: {len(social_data)} posts")
-                tracker.update("social_mining", completed=1, status="completed")
-                
-                return social_data
-            except Exception as e:
-                print(f"❌ Error in social mining: {str(e)}")
-                tracker.update("social_mining", completed=1, status="completed")
-                return []
-        
-        social_future = executor.submit(mine_social_trends)
-        
-        # Collect scraping results
-        our_details = []
-        all_competitor_details = {}
+    async def produce() -> list:
+        results = await asyncio.gather(*(scrape_competitor(u) for u in competitors))
+        for _ in range(num_workers):
+            await gap_queue.put(None)
         
-        for future in as_completed(future_to_url):
-            site_type, url = future_to_url[future]
-            url_result, details, error = future.result()
-            
-            if site_type == "own":
-                our_details = details
-            else:
-                all_competitor_details[url_result] = details
-        
-        # Wait for social mining to complete
-        social_data = social_future.result()
+        _, our_details, _ = await own_task
+        fire_and_forget(stream_sitemap, SITEMAPS_PATH, our_details,
+                        {url: details for url, details, _ in results})
+        return results
     
-    tracker.update("sitemap_scraping", status="completed")
+    async def own_titles_ready() -> tuple:
+        _, our_details, _ = await own_task
+        own_titles = [page.title for page in our_details]
+        return own_titles, title_set(own_titles)
     
-    # Save sitemap data
-    all_details = {
-        "our_pages": our_details,
-        "competitor_pages": all_competitor_details
-    }
-    with open("data/sitemaps_data.json", "w", encoding="utf-8") as f:
-        json.dump(all_details, f, indent=2, ensure_ascii=False)
-    print(f"✅ Saved sitemap data for {len(competitors)} competitors.")
+    # Computed once and shared (immutable) by every consumer
+    own_titles_task = asyncio.create_task(own_titles_ready())
     
-    # Save social data
-    with open("data/social_trends_raw.json", "w", encoding="utf-8") as f:
-        json.dump(social_data, f, indent=2, ensure_ascii=False)
-    print(f"✅ Saved {len(social_data)} social posts.")
+    async def consume() -> List[Dict]:
+        # Gap prompts need our own titles, so wait for that scrape first
+        own_titles, own_title_set = await own_titles_task
+        gaps = []
+        while True:
+            item = await gap_queue.get()
+            if item is None:
+                return gaps
+            # Fold whatever else has already arrived into the same batched call
+            batch = dict([item])
+            while not gap_queue.empty():
+                extra = gap_queue.get_nowait()
+                if extra is None:
+                    gap_queue.put_nowait(None)
+                    break
+                batch[extra[0]] = extra[1]
+            gaps.extend(await analyze_gaps_for_competitors_async(batch, own_titles, finder, own_title_set))
+    
+    async def mine_then_analyze_trends() -> tuple:
+        social_data = await mine_social_trends(keywords, social_date, social_date)
+        fire_and_forget(write_msgpack_list, SOCIAL_RAW_PATH, social_data)
+        trending_input = await loop.run_in_executor(None, analyze_trends, social_data)
+        fire_and_forget_write(TRENDS_REPORT_PATH, trending_input)
+        return social_data, trending_input
+    
+    try:
+        own_result, competitor_results, (social_data, trending_input), *gap_results = await asyncio.gather(
+            own_task, produce(), mine_then_analyze_trends(),
+            *(consume() for _ in range(num_workers)),
+        )
+        content_gaps_combined = [gap for gaps in gap_results for gap in gaps]
+        fire_and_forget(write_msgpack_list, GAPS_REPORT_PATH, content_gaps_combined)
+    finally:
+        await asyncio.gather(*warmups, return_exceptions=True)
+        await finder.async_client.close()
+        await close_session()
+        await flush_pending_writes()
     
-    return our_details, all_competitor_details, social_data
+    our_details = own_result[1]
+    all_competitor_details = {url: details for url, details, _ in competitor_results}
+    return our_details, all_competitor_details, social_data, content_gaps_combined, trending_input
 
 
-# -----------------------------
-# PHASE 3 & 4: PARALLEL ANALYSIS
-# -----------------------------
-def run_phase_3_and_4_parallel(our_details, all_competitor_details, social_data):
-    """Run trend analysis and gap analysis in parallel"""
+def run_phases_1_to_4_pipelined(our_url: str = "https://www.aicerts.ai/",
+                                competitors: List[str] = None,
+                                keywords: List[str] = None):
+    """Run data collection and analysis as one overlapped pipeline (phases 1-4)"""
     
     print("\n" + "="*70)
-    print("🚀 PHASE 3 & 4: PARALLEL ANALYSIS")
+    print("🚀 PHASES 1-4: PIPELINED COLLECTION & ANALYSIS")
     print("="*70)
+    competitors = competitors or []
+    scraper, own_range, comp_range, social_date = _pipeline_setup()
     
+    tracker.update("sitemap_scraping", total=len(competitors) + 1, completed=0, status="running")
+    tracker.update("social_mining", total=1, completed=0, status="running")
     tracker.update("trend_analysis", total=1, completed=0, status="running")
-    tracker.update("gap_analysis", total=len(all_competitor_details), completed=0, status="running")
+    tracker.update("gap_analysis", total=len(competitors), completed=0, status="running")
     
-    own_titles = [page['title'] for page in our_details]
-    
-    with ThreadPoolExecutor(max_workers=len(all_competitor_details) + 1) as executor:
-        # Submit trend analysis
-        def analyze_trends():
-            try:
-                print("⚙️  Starting trend analysis...")
-                analyzer = TrendAnalyzer(api_key=OPENAI_API_KEY)
-                trending_input = analyzer.run_from_data(social_data, apply_elbow=True, show_plot=False)
-                
-                print(f"✅ Completed trend analysis: {len(trending_input)} clusters")
-                tracker.update("trend_analysis", completed=1, status="completed")
-                
-                return trending_input
-            except Exception as e:
-                print(f"❌ Error in trend analysis: {str(e)}")
-                tracker.update("trend_analysis", completed=1, status="completed")
-                return []
-        
-        trend_future = executor.submit(analyze_trends)
-        
-        # Submit gap analysis for all competitors in parallel
-        gap_futures = []
-        for comp_url, comp_pages in all_competitor_details.items():
-            future = executor.submit(
-                analyze_gap_for_competitor,
-                comp_url, comp_pages, own_titles, OPENAI_API_KEY
-            )
-            gap_futures.append(future)
-        
-        # Collect results
-        trending_input = trend_future.result()
-        
-        content_gaps_combined = []
-        for future in as_completed(gap_futures):
-            gaps = future.result()
-            content_gaps_combined.extend(gaps)
+    our_details, all_competitor_details, social_data, content_gaps_combined, trending_input = asyncio.run(
+        _run_phases_1_to_4(
+            scraper, our_url, competitors, keywords,
+            own_range=own_range,
+            comp_range=comp_range,
+            social_date=social_date,
+        )
+    )
     
+    tracker.update("sitemap_scraping", status="completed")
     tracker.update("gap_analysis", status="completed")
-    
-    # Save results
-    with open("data/trending_topics_report.json", "w", encoding="utf-8") as f:
-        json.dump(trending_input, f, indent=2, ensure_ascii=False)
+    # Artifacts were written in the background as each became available
+    print(f"✅ Saved sitemap data for {len(all_competitor_details)} competitors.")
+    print(f"✅ Saved {len(social_data)} social posts.")
     print(f"✅ Saved {len(trending_input)} trending clusters.")
-    
-    with open("data/content_gaps_report.json", "w", encoding="utf-8") as f:
-        json.dump(content_gaps_combined, f, indent=2, ensure_ascii=False)
     print(f"✅ Saved {len(content_gaps_combined)} total content gaps.")
     
-    return content_gaps_combined, trending_input
+    return our_details, all_competitor_details, social_data, content_gaps_combined, trending_input
 
 
 # -----------------------------
 # PHASE 5: CONTENT BRIEF GENERATION
 # -----------------------------
-# def run_phase_5(content_gaps_combined, trending_input):
-#     """Generate content briefs"""
-    
-#     print("\n" + "="*70)
-#     print("🚀 PHASE 5: CONTENT BRIEF GENERATION")
-#     print("="*70)
-    
-#     tracker.update("brief_generation", total=1, completed=0, status="running")
-    
-#     generator = ContentBriefGenerator(api_key=OPENAI_API_KEY)
-#     result = generator.generate_content_briefs(content_gaps_combined, trending_input)
-    
-#     with open("data/content_briefs.json", "w", encoding="utf-8") as f:
-#         json.dump(result, f, indent=2, ensure_ascii=False)
-    
-#     tracker.update("brief_generation", completed=1, status="completed")
-#     print(f"✅ Saved {len(result)} generated briefs.")
-    
-#     return result
-
 def run_phase_5(content_gaps_combined, trending_input):
     """Generate content briefs (Phase 5) and save them to DB"""
 
@@ -368,28 +552,20 @@ def run_phase_5(content_gaps_combined, trending_input):
 
     tracker.update("brief_generation", total=1, completed=0, status="running")
 
-    generator = ContentBriefGenerator(api_key=OPENAI_API_KEY)
-
     # -----------------------------
     # 1️⃣ Generate Content Briefs
     # -----------------------------
-    result = generator.generate_content_briefs(
-        content_gaps_combined,
-        trending_input
-    )
+    result = _content_briefs(content_gaps_combined, trending_input)
 
     print(f"📦 Generated {len(result)} briefs.")
 
     # -----------------------------
     # 2️⃣ Save Each Brief to DB
     # -----------------------------
-    from models import save_brief   # ⚠️ update import path
+    from models import save_briefs_bulk   # ⚠️ update import path
     # (where you pasted the script with Brief + BriefTalkingPoint)
 
-    saved_ids = []
-    for item in result:
-        brief_id = save_brief(item)
-        saved_ids.append(brief_id)
+    saved_ids = save_briefs_bulk(result)
 
     print(f"💾 Saved {len(saved_ids)} briefs to database.")
 
@@ -397,8 +573,7 @@ def run_phase_5(content_gaps_combined, trending_input):
     # 3️⃣ Save JSON file (optional)
     # -----------------------------
     try:
-        with open("data/content_briefs.json", "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        write_json(BRIEFS_PATH, result)
         print("📂 content_briefs.json saved.")
     except Exception as e:
         print("❌ Error saving JSON:", e)
@@ -432,16 +607,13 @@ if __name__ == "__main__":
         "https://www.skillsoft.com"
     ]
     try:
-        # Phase 1 & 2: Parallel data collection
-        our_details, all_competitor_details, social_data = run_phase_1_and_2_parallel(our_url, competitors)
-        
-        # Phase 3 & 4: Parallel analysis
-        content_gaps_combined, trending_input = run_phase_3_and_4_parallel(
-            our_details, all_competitor_details, social_data
-        )
+        # Phases 1-4: collection pipelined into analysis
+        (our_details, all_competitor_details, social_data,
+         content_gaps_combined, trending_input) = run_phases_1_to_4_pipelined(our_url, competitors)
         
         # Phase 5: Brief generation
         result = run_phase_5(content_gaps_combined, trending_input)
+        tracker.stop()
         
         # Final summary
         total_time = datetime.now() - start_time
@@ -0,0 +1,92 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================================
+# 🧮 Embedding Cache
+# ==========================================================
+class EmbeddingCache:
+    """
+    Content-addressed on-disk cache of embedding vectors.
+
+    Keys are SHA256(model + "|" + text), so unchanged pages/topics on daily
+    re-runs are served from SQLite instead of the embeddings API. Lookups and
+    writes are batched: one SELECT and one commit per embedding request.
+    """
+
+    # Stay well under SQLite's bound-parameter limit
+    _CHUNK = 500
+
+    def __init__(self, path: str = "data/embed_cache.sqlite"):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    hash TEXT PRIMARY KEY,
+                    embedding BLOB NOT NULL,
+                    model TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}|{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            for i in range(0, len(unique), self._CHUNK):
+                chunk = unique[i:i + self._CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT hash, embedding FROM embeddings WHERE hash IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        self.stats["hits"] += sum(1 for k in keys if k in found)
+        self.stats["misses"] += sum(1 for k in keys if k not in found)
+        return found
+
+    def put_many(self, rows: Iterable[Tuple[str, str, np.ndarray]]) -> None:
+        """Store (key, model, vector) rows in a single transaction."""
+        payload = [
+            (key, np.asarray(vector, dtype=np.float32).tobytes(), model)
+            for key, model, vector in rows
+        ]
+        if not payload:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (hash, embedding, model) VALUES (?, ?, ?)",
+                payload,
+            )
+            self._conn.commit()
+
+
+_shared_cache: Optional[EmbeddingCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_embed_cache() -> EmbeddingCache:
+    """Process-wide default cache (one SQLite connection for every embedder)."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = EmbeddingCache()
+        return _shared_cache
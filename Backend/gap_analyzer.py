@@ -1,10 +1,24 @@
+import asyncio
+import copy
+import functools
+import hashlib
 import logging
-import json
-from openai import OpenAI
-from pydantic import BaseModel
-from typing import List
+import re
+import sys
+import time
+from openai import OpenAI, AsyncOpenAI
+from pydantic import BaseModel, Field, ValidationError
+from typing import Dict, List, Literal, Optional
 from dotenv import load_dotenv
+import numpy as np
+import orjson
 import os   
+
+from backoff import EmptyResponseError, retry_openai
+from concurrency import config
+from embed_cache import EmbeddingCache, shared_embed_cache
+from llm_cache import LLMCache, shared_llm_cache
+from openai_http import async_http_client, shared_http_client
 load_dotenv()
 # -----------------------------
 # LOGGING SETUP
@@ -17,7 +31,8 @@ logger = logging.getLogger("ContentGapFinder")
 # Pydantic Response Models
 # -----------------------------
 class GapItem(BaseModel):
-    gap_topic: str
+    # The description lands in the response schema and keeps completions terse
+    gap_topic: str = Field(description="Short topic phrase (a few words), not a sentence")
     competitor_coverage: int
     # gap_description: str  # <-- Added detailed explanation
 
@@ -26,64 +41,620 @@ class Gaps(BaseModel):
     gaps: List[GapItem]
 
 
+class CompetitorGaps(BaseModel):
+    competitor: str
+    gaps: List[GapItem]
+
+
+class GapsByCompetitor(BaseModel):
+    competitors: List[CompetitorGaps]
+
+
+@functools.lru_cache(maxsize=None)
+def _strict_format(response_model: type) -> dict:
+    # `responses.parse` re-derives this schema from the model on every call;
+    # built once per model here and shared by live and batch requests
+    from openai.lib._pydantic import to_strict_json_schema
+
+    return {
+        "type": "json_schema",
+        "name": response_model.__name__,
+        "schema": to_strict_json_schema(response_model),
+        "strict": True,
+    }
+
+
+# -----------------------------
+# Title Helpers
+# -----------------------------
+_NON_WORD = re.compile(r"\W+")
+
+
+@functools.lru_cache(maxsize=8192)
+def _normalize(title: str) -> str:
+    # Each title is normalized for dedupe, the covered check and our own set;
+    # memoized (and interned) so repeats cost one dict hit
+    return sys.intern(_NON_WORD.sub(" ", title.lower()).strip())
+
+
+def titles_of(rows) -> List[str]:
+    """
+    Project page records (sitemap dicts or Page objects) to a flat title list
+    once at entry; everything downstream (dedupe, embeddings, prompts) only
+    reads titles. Plain strings pass through.
+    """
+    return [r if isinstance(r, str) else r["title"] if isinstance(r, dict) else r.title for r in rows]
+
+
+def dedupe_titles(titles: List[str]) -> List[str]:
+    """Drop titles that are identical after lowercasing and punctuation folding (keeps first)."""
+    seen = set()
+    return [t for t in titles if (k := _normalize(t)) not in seen and not seen.add(k)]
+
+
+def title_set(titles: List[str]) -> frozenset:
+    """Normalized, immutable title set; build once per run and share across workers."""
+    return frozenset(_normalize(t) for t in titles)
+
+
+def _words(text: str) -> set:
+    # Content words only; short ones ("ai", "the", "how") match everything
+    return {w for w in _normalize(text).split() if len(w) > 3}
+
+
+def _grounded(gaps, competitor_titles: List[str]) -> bool:
+    """
+    Whether every gap topic shares a content word with the given competitor
+    titles. A cached answer failing this was written for articles that are
+    no longer in the input.
+    """
+    vocabulary = set().union(*map(_words, competitor_titles))
+    return all(_words(g.gap_topic) & vocabulary for g in gaps)
+
+
+def _drop_covered(titles: List[str], own_title_set: frozenset) -> List[str]:
+    # A competitor title we already publish verbatim can't be a gap
+    return [t for t in titles if _normalize(t) not in own_title_set]
+
+
+def _drop_near_covered(titles_by_competitor: Dict[str, List[str]], own_vectors: np.ndarray,
+                       vectors: Dict[str, np.ndarray], threshold: float) -> Dict[str, List[str]]:
+    """Drop competitor titles whose best cosine match among our titles reaches threshold."""
+    kept = {}
+    for url, titles in titles_by_competitor.items():
+        embedded = [t for t in titles if t in vectors]
+        if not embedded or own_vectors.size == 0:
+            kept[url] = titles
+            continue
+        best = (np.vstack([vectors[t] for t in embedded]) @ own_vectors.T).max(axis=1)
+        covered = {t for t, sim in zip(embedded, best) if sim >= threshold}
+        kept[url] = [t for t in titles if t not in covered]
+    return kept
+
+
 # -----------------------------
 # MAIN CLASS
 # -----------------------------
+# Transient failures (429, 5xx, timeouts, empty parses) are retried with
+# jittered exponential backoff; anything else fails on the first attempt
+MAX_ATTEMPTS = 6
+
+
 class ContentGapFinder:
-    def __init__(self, api_key: str):
-        """Initialize OpenAI client with credentials."""
-        self.client = OpenAI(api_key=api_key)
+    MODEL = "gpt-4o-2024-08-06"
+    EMBEDDING_MODEL = "text-embedding-3-small"
+    # Competitor titles at least this close to one of ours are paraphrases, not gaps
+    COVERED_SIMILARITY = 0.85
+    # Requests for the same competitor(s) whose competitor titles embed at
+    # least this close reuse a cached answer
+    SEMANTIC_SIMILARITY = 0.92
+    # Batch polling: exponential backoff from BATCH_POLL_BASE up to BATCH_POLL_CAP seconds
+    BATCH_POLL_BASE = 10
+    BATCH_POLL_CAP = 300
+    BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+    def __init__(self, api_key: str, cache: Optional[LLMCache] = None, use_cache: bool = True,
+                 embed_cache: Optional[EmbeddingCache] = None):
+        """Initialize OpenAI client with credentials (pooled; share one finder across competitors)."""
+        # Retries are _parse's job (see MAX_ATTEMPTS), not the SDK's
+        self.client = OpenAI(api_key=api_key, http_client=shared_http_client(), max_retries=0)
+        self.async_client = AsyncOpenAI(api_key=api_key, http_client=async_http_client(), max_retries=0)
+        # Same title lists -> same prompt hash -> no API call on re-runs
+        self.cache = (cache or shared_llm_cache()) if use_cache else None
+        self.embed_cache = (embed_cache or shared_embed_cache()) if use_cache else None
         logger.info("✅ ContentGapFinder initialized successfully")
 
-    def make_llm_call(self, ai_titles, competitor_titles, max_retries=3):
-        """Compare two title lists and identify missing topics using LLM."""
-        user_prompt = f"""
-    Compare the following lists of webpage titles:
-    - Our Titles: {json.dumps(ai_titles, indent=2)}
-    - Competitor Titles: {json.dumps(competitor_titles, indent=2)}
-
-    Identify key content gaps — topics that competitors cover but we do not.
-    For each gap:
-    1. Provide a clear descriptive and  human-readable title.
-    2. Estimate how many competitor titles mention or relate to it (competitor_coverage).
-    """
+    # -----------------------------
+    # Embeddings (one request for every competitor)
+    # -----------------------------
+    def _cached_vectors(self, titles):
+        """Return ({title: vector} served from cache, titles still to embed)."""
+        unique = list(dict.fromkeys(titles))
+        keys = {t: EmbeddingCache.make_key(self.EMBEDDING_MODEL, t) for t in unique}
+        cached = self.embed_cache.get_many(list(keys.values())) if self.embed_cache is not None else {}
+        found = {t: cached[k] for t, k in keys.items() if k in cached}
+        return found, [t for t in unique if t not in found]
+
+    def _store_vectors(self, missing, response, found):
+        fresh = {t: np.asarray(d.embedding, dtype=np.float32) for t, d in zip(missing, response.data)}
+        # text-embedding-3 vectors are unit length, so a dot product is the cosine
+        found.update(fresh)
+        if self.embed_cache is not None:
+            self.embed_cache.put_many(
+                (EmbeddingCache.make_key(self.EMBEDDING_MODEL, t), self.EMBEDDING_MODEL, v)
+                for t, v in fresh.items()
+            )
+        return found
+
+    def embed_titles(self, titles):
+        """Embed titles in a single request (cached ones skipped); None if the call fails."""
+        found, missing = self._cached_vectors(titles)
+        if not missing:
+            return found
+        try:
+            response = self.client.embeddings.create(model=self.EMBEDDING_MODEL, input=missing)
+        except Exception as e:
+            logger.warning(f"Embedding failed, continuing without it: {e}")
+            return None
+        return self._store_vectors(missing, response, found)
+
+    async def embed_titles_async(self, titles):
+        """Async variant of embed_titles."""
+        found, missing = self._cached_vectors(titles)
+        if not missing:
+            return found
+        try:
+            response = await self.async_client.embeddings.create(model=self.EMBEDDING_MODEL, input=missing)
+        except Exception as e:
+            logger.warning(f"Embedding failed, continuing without it: {e}")
+            return None
+        return self._store_vectors(missing, response, found)
+
+    def _filter_near_covered(self, ai_titles, titles_by_competitor, vectors):
+        if vectors is None:
+            return titles_by_competitor
+        own = [vectors[t] for t in ai_titles if t in vectors]
+        own_vectors = np.vstack(own) if own else np.empty((0, 0))
+        kept = _drop_near_covered(titles_by_competitor, own_vectors, vectors, self.COVERED_SIMILARITY)
+        dropped = sum(len(t) for t in titles_by_competitor.values()) - sum(len(t) for t in kept.values())
+        if dropped:
+            logger.info(f"Dropped {dropped} competitor titles already covered by ours")
+        return kept
+
+    def _prefilter(self, ai_titles, titles_by_competitor, own_title_set, vectors):
+        # Verbatim matches go first (free); the remaining near-paraphrases need `vectors`
+        titles_by_competitor = {url: _drop_covered(titles, own_title_set) for url, titles in titles_by_competitor.items()}
+        return self._filter_near_covered(ai_titles, titles_by_competitor, vectors)
+
+    @staticmethod
+    def _all_titles(ai_titles, titles_by_competitor):
+        # The embeddings endpoint rejects empty strings; untitled pages just skip the filter
+        return [t for t in (*ai_titles, *(t for titles in titles_by_competitor.values() for t in titles)) if t]
+
+    @staticmethod
+    def _bullets(titles):
+        # One "- title" line per title: a fraction of the tokens of indented JSON
+        return "\n".join(f"- {t}" for t in titles) or "(none)"
+
+    @classmethod
+    def _build_input(cls, ai_titles, competitor_titles):
+        user_prompt = f"""Compare the following lists of webpage titles.
+
+Our Titles:
+{cls._bullets(ai_titles)}
 
-        for attempt in range(max_retries):
+Competitor Titles:
+{cls._bullets(competitor_titles)}
+
+Identify key content gaps — topics that competitors cover but we do not.
+For each gap:
+1. Provide a short, descriptive, human-readable title.
+2. Estimate how many competitor titles mention or relate to it (competitor_coverage).
+"""
+        return [
+            {"role": "system", "content": "You are a content analyst. Identify missing topic coverage between two lists of page titles."},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    @classmethod
+    def _build_batch_input(cls, ai_titles, titles_by_competitor):
+        competitors = "\n\n".join(f"Competitor {url}:\n{cls._bullets(titles)}" for url, titles in titles_by_competitor.items())
+        user_prompt = f"""Compare our webpage titles against each competitor's webpage titles.
+
+Our Titles:
+{cls._bullets(ai_titles)}
+
+{competitors}
+
+For EACH competitor separately, identify key content gaps — topics that competitor covers but we do not.
+Return one entry per competitor, with `competitor` set to its URL exactly as given.
+For each gap:
+1. Provide a short, descriptive, human-readable title.
+2. Estimate how many of that competitor's titles mention or relate to it (competitor_coverage).
+"""
+        return [
+            {"role": "system", "content": "You are a content analyst. Identify missing topic coverage between our page titles and each competitor's page titles."},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    @staticmethod
+    def _semantic_text(competitor_titles):
+        """
+        Order-insensitive description of a request, embedded for the semantic
+        cache tier. Only competitor titles go in: our own 30-day list barely
+        changes between runs and would swamp a new day's competitor articles.
+        """
+        if isinstance(competitor_titles, dict):
+            competitor_titles = {url: sorted(titles) for url, titles in competitor_titles.items()}
+        else:
+            competitor_titles = sorted(competitor_titles)
+        return orjson.dumps(competitor_titles, option=orjson.OPT_SORT_KEYS).decode("utf-8")
+
+    @staticmethod
+    def _namespace(text_format, urls):
+        # An answer only fits a request about the same competitors, so
+        # semantic matches are confined to requests over the same URL set
+        digest = hashlib.sha256(orjson.dumps(sorted(urls))).hexdigest()[:16]
+        return f"{text_format.__name__}:{digest}"
+
+    @staticmethod
+    def _answers(parsed, competitor_titles):
+        """Whether a cached response is about the given competitor titles (see _grounded)."""
+        if isinstance(parsed, GapsByCompetitor):
+            return all(entry.competitor in competitor_titles
+                       and _grounded(entry.gaps, competitor_titles[entry.competitor])
+                       for entry in parsed.competitors)
+        return _grounded(parsed.gaps, competitor_titles)
+
+    def _cache_lookup(self, input, text_format):
+        if self.cache is None:
+            return None, None
+        key = LLMCache.make_key(orjson.dumps(input).decode("utf-8"), self.MODEL, text_format.__name__)
+        hit = self.cache.get_exact(key)
+        if hit is None:
+            return key, None
+        return key, text_format.model_validate_json(hit)
+
+    def _semantic_lookup(self, namespace, text_format, vectors, cache_text, competitor_titles):
+        """Return (embedding, cached response or None); embedding is None if embedding failed."""
+        embedding = vectors.get(cache_text) if vectors is not None else None
+        if embedding is None:
+            return None, None
+        hit = self.cache.get_semantic(namespace, embedding, threshold=self.SEMANTIC_SIMILARITY)
+        if hit is None:
+            return embedding, None
+        parsed = text_format.model_validate_json(hit)
+        if not self._answers(parsed, competitor_titles):
+            logger.info("Semantic cache hit describes other articles; treating as a miss")
+            return embedding, None
+        return embedding, parsed
+
+    def _cache_store(self, key, namespace, parsed, embedding=None):
+        if self.cache is not None and key is not None:
+            self.cache.set(key, namespace, parsed.model_dump_json(), embedding)
+
+    def _parse(self, input, text_format, max_retries=MAX_ATTEMPTS, competitor_titles=None, namespace=None):
+        """
+        A `namespace` (see _namespace) plus the request's `competitor_titles`
+        enable the semantic tier: near-identical competitor titles for the
+        same competitors reuse the cached gaps. Without them only exact
+        prompt matches are served from cache.
+        """
+        semantic = namespace is not None and competitor_titles is not None
+        namespace = namespace or text_format.__name__
+        key, cached = self._cache_lookup(input, text_format)
+        if cached is not None:
+            return cached
+        embedding = None
+        if key is not None and semantic:
+            cache_text = self._semantic_text(competitor_titles)
+            embedding, cached = self._semantic_lookup(namespace, text_format, self.embed_titles([cache_text]),
+                                                      cache_text, competitor_titles)
+            if cached is not None:
+                return cached
+        if key is not None:
+            self.cache.record_miss()
+        try:
+            parsed = retry_openai(max_retries)(self._parse_once)(input, text_format)
+        except Exception as e:
+            logger.error(f"❌ Failed to retrieve valid LLM response: {e}")
+            return None
+        self._cache_store(key, namespace, parsed, embedding)
+        return parsed
+
+    @staticmethod
+    def _check_stream_event(event):
+        # A failed response is known mid-stream; don't wait for the body to finish
+        if event.type == "error":
+            raise RuntimeError(f"Stream error: {event.message}")
+        if event.type == "response.failed":
+            raise RuntimeError(f"Response failed: {event.response.error}")
+
+    @staticmethod
+    def _validate_output(response, text_format):
+        output_text = getattr(response, "output_text", None)
+        if not output_text:
+            raise EmptyResponseError("empty response")
+        return text_format.model_validate_json(output_text)
+
+    def _parse_once(self, input, text_format):
+        # Streamed, so the body is read as it is generated
+        with self.client.responses.stream(
+            model=self.MODEL,
+            input=input,
+            text={"format": _strict_format(text_format)},
+            temperature=0,
+        ) as stream:
+            for event in stream:
+                self._check_stream_event(event)
+            response = stream.get_final_response()
+        return self._validate_output(response, text_format)
+
+    async def _parse_async(self, input, text_format, max_retries=MAX_ATTEMPTS, competitor_titles=None, namespace=None):
+        semantic = namespace is not None and competitor_titles is not None
+        namespace = namespace or text_format.__name__
+        key, cached = self._cache_lookup(input, text_format)
+        if cached is not None:
+            return cached
+        embedding = None
+        if key is not None and semantic:
+            cache_text = self._semantic_text(competitor_titles)
+            vectors = await self.embed_titles_async([cache_text])
+            embedding, cached = self._semantic_lookup(namespace, text_format, vectors, cache_text, competitor_titles)
+            if cached is not None:
+                return cached
+        if key is not None:
+            self.cache.record_miss()
+        try:
+            parsed = await retry_openai(max_retries)(self._parse_once_async)(input, text_format)
+        except Exception as e:
+            logger.error(f"❌ Failed to retrieve valid LLM response: {e}")
+            return None
+        self._cache_store(key, namespace, parsed, embedding)
+        return parsed
+
+    async def _parse_once_async(self, input, text_format):
+        async with self.async_client.responses.stream(
+            model=self.MODEL,
+            input=input,
+            text={"format": _strict_format(text_format)},
+            temperature=0,
+        ) as stream:
+            async for event in stream:
+                self._check_stream_event(event)
+            response = await stream.get_final_response()
+        return self._validate_output(response, text_format)
+
+    # -----------------------------
+    # Batch API (offline, ~50% cheaper, up to 24h turnaround)
+    # -----------------------------
+    def _batch_line(self, custom_id, input):
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/responses",
+            "body": {"model": self.MODEL, "input": input, "temperature": 0,
+                     "text": {"format": _strict_format(Gaps)}},
+        }
+
+    @staticmethod
+    def _batch_output_text(body):
+        for item in body.get("output", []):
+            if item.get("type") == "message":
+                for part in item.get("content", []):
+                    if part.get("type") == "output_text":
+                        return part.get("text")
+        return None
+
+    def _run_batch(self, inputs):
+        """Run {custom_id: input} as one batch job and block until it ends; returns {custom_id: Gaps}."""
+        payload = b"\n".join(orjson.dumps(self._batch_line(cid, input)) for cid, input in inputs.items())
+        input_file = self.client.files.create(file=("gap_analysis_batch.jsonl", payload), purpose="batch")
+        batch = self.client.batches.create(input_file_id=input_file.id, endpoint="/v1/responses", completion_window="24h")
+        logger.info(f"Submitted gap batch {batch.id} with {len(inputs)} requests")
+
+        attempt = 0
+        while batch.status not in self.BATCH_TERMINAL_STATUSES:
+            time.sleep(min(self.BATCH_POLL_CAP, self.BATCH_POLL_BASE * 2 ** attempt))
+            attempt += 1
+            batch = self.client.batches.retrieve(batch.id)
+            logger.info(f"Batch {batch.id} status: {batch.status}")
+
+        if batch.status != "completed" or not batch.output_file_id:
+            logger.error(f"❌ Gap batch {batch.id} ended with status {batch.status}")
+            return {}
+
+        parsed = {}
+        for line in self.client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                logger.error(f"❌ Skipping unreadable batch output line: {e}")
+                continue
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                logger.error(f"❌ Batch request {record.get('custom_id')} failed: {record.get('error')}")
+                continue
+            text = self._batch_output_text(response.get("body", {}))
+            if text is None:
+                logger.error(f"❌ Batch request {record.get('custom_id')} returned no output text")
+                continue
+            # A 200 can still carry a truncated (incomplete) or off-schema body
             try:
-                response = self.client.responses.parse(
-                    model="gpt-4o-2024-08-06",
-                    input=[
-                        {"role": "system", "content": "You are a content analyst. Identify missing topic coverage between two lists of page titles."},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    text_format=Gaps,
-                    temperature=0,
-                )
-                parsed = getattr(response, "output_parsed", None)
-                # print(parsed.model_dump())
-                if parsed is not None:
-
-                    return parsed.model_dump()["gaps"]
-                logger.warning(f"Attempt {attempt + 1}/{max_retries}: Empty response, retrying...")
-            except Exception as e:
-                logger.warning(f"Attempt {attempt + 1}/{max_retries}: API error: {e}")
-
-        logger.error("❌ Failed to retrieve valid LLM response after all retries.")
-        return []
-
-    def find_gaps(self, ai_titles, competitor_titles):
-        """High-level method to run analysis and return gaps."""
+                parsed[record["custom_id"]] = Gaps.model_validate_json(text)
+            except ValidationError as e:
+                logger.error(f"❌ Batch request {record.get('custom_id')} returned invalid gaps: {e}")
+        return parsed
+
+    def submit_batch(self, pairs):
+        """
+        Gap analysis for many (ai_titles, competitor_titles) pairs as one
+        Batch API job; returns one gap list per pair, in order. Blocks while
+        the job runs (minutes to hours), so keep it to offline runs.
+        Cached pairs are answered locally and left out of the job.
+        """
+        results, pending = [[] for _ in pairs], {}
+        for i, (ai_titles, competitor_titles) in enumerate(pairs):
+            input = self._build_input(ai_titles, competitor_titles)
+            key, cached = self._cache_lookup(input, Gaps)
+            if cached is not None:
+                results[i] = cached.model_dump()["gaps"]
+            else:
+                pending[f"gap-{i}"] = (i, input, key)
+        if not pending:
+            return results
+
+        if self.cache is not None:
+            for _ in pending:
+                self.cache.record_miss()
+        parsed = self._run_batch({cid: input for cid, (_, input, _) in pending.items()})
+        for cid, (i, _, key) in pending.items():
+            if cid in parsed:
+                self._cache_store(key, Gaps.__name__, parsed[cid])
+                results[i] = parsed[cid].model_dump()["gaps"]
+        return results
+
+    @staticmethod
+    def _split_batch(parsed, titles_by_competitor):
+        """Map a GapsByCompetitor result back onto the requested competitor URLs."""
+        gaps_by_competitor = {url: [] for url in titles_by_competitor}
+        if parsed is None:
+            return gaps_by_competitor
+        for entry in parsed.competitors:
+            if entry.competitor not in gaps_by_competitor:
+                logger.warning(f"Ignoring gaps for unknown competitor '{entry.competitor}'")
+                continue
+            gaps_by_competitor[entry.competitor].extend(g.model_dump() for g in entry.gaps)
+        return gaps_by_competitor
+
+    def _competitor_namespace(self, competitor_url):
+        # No URL, no semantic tier: nothing would keep one competitor's gaps from another's
+        return self._namespace(Gaps, [competitor_url]) if competitor_url else None
+
+    def make_llm_call(self, ai_titles, competitor_titles, max_retries=MAX_ATTEMPTS, competitor_url=None):
+        """
+        Compare two title lists and identify missing topics using LLM.
+        Pass `competitor_url` to let earlier, near-identical requests for
+        that competitor answer from the semantic cache.
+        """
+        parsed = self._parse(self._build_input(ai_titles, competitor_titles), Gaps, max_retries,
+                             competitor_titles=competitor_titles,
+                             namespace=self._competitor_namespace(competitor_url))
+        return parsed.model_dump()["gaps"] if parsed is not None else []
+
+    async def make_llm_call_async(self, ai_titles, competitor_titles, max_retries=MAX_ATTEMPTS, competitor_url=None):
+        """Async variant of make_llm_call (uses the shared AsyncOpenAI client)."""
+        parsed = await self._parse_async(self._build_input(ai_titles, competitor_titles), Gaps, max_retries,
+                                         competitor_titles=competitor_titles,
+                                         namespace=self._competitor_namespace(competitor_url))
+        return parsed.model_dump()["gaps"] if parsed is not None else []
+
+    def find_gaps_batch(self, ai_titles, titles_by_competitor, own_title_set=None, vectors=None):
+        """
+        Find gaps against every competitor in a single LLM call; returns {competitor_url: gaps}.
+
+        `vectors` maps title -> embedding; when omitted every title is embedded
+        in one request and near-paraphrases of our titles are dropped first.
+        """
+        own_title_set = own_title_set if own_title_set is not None else title_set(ai_titles)
+        if vectors is None:
+            vectors = self.embed_titles(self._all_titles(ai_titles, titles_by_competitor))
+        titles_by_competitor = self._prefilter(ai_titles, titles_by_competitor, own_title_set, vectors)
+        logger.info(f"Running batched gap analysis: {len(ai_titles)} own titles vs {len(titles_by_competitor)} competitors...")
+        parsed = self._parse(self._build_batch_input(ai_titles, titles_by_competitor), GapsByCompetitor,
+                             competitor_titles=titles_by_competitor,
+                             namespace=self._namespace(GapsByCompetitor, titles_by_competitor))
+        return self._split_batch(parsed, titles_by_competitor)
+
+    async def find_gaps_batch_async(self, ai_titles, titles_by_competitor, own_title_set=None, vectors=None):
+        """Async variant of find_gaps_batch."""
+        own_title_set = own_title_set if own_title_set is not None else title_set(ai_titles)
+        if vectors is None:
+            vectors = await self.embed_titles_async(self._all_titles(ai_titles, titles_by_competitor))
+        titles_by_competitor = self._prefilter(ai_titles, titles_by_competitor, own_title_set, vectors)
+        logger.info(f"Running batched gap analysis: {len(ai_titles)} own titles vs {len(titles_by_competitor)} competitors...")
+        parsed = await self._parse_async(self._build_batch_input(ai_titles, titles_by_competitor), GapsByCompetitor,
+                                         competitor_titles=titles_by_competitor,
+                                         namespace=self._namespace(GapsByCompetitor, titles_by_competitor))
+        return self._split_batch(parsed, titles_by_competitor)
+
+    async def find_gaps_async(self, ai_titles, competitor_titles, own_title_set=None, vectors=None,
+                              competitor_url=None):
+        """Async variant of find_gaps."""
+        own_title_set = own_title_set if own_title_set is not None else title_set(ai_titles)
+        if vectors is None:
+            vectors = await self.embed_titles_async(self._all_titles(ai_titles, {None: competitor_titles}))
+        competitor_titles = self._prefilter(ai_titles, {None: competitor_titles}, own_title_set, vectors)[None]
         logger.info(f"Running gap analysis between {len(ai_titles)} own titles and {len(competitor_titles)} competitor titles...")
+        return await self.make_llm_call_async(ai_titles, competitor_titles, competitor_url=competitor_url)
 
-        result = self.make_llm_call(ai_titles, competitor_titles)
-        return result
-        print(result)
-        gaps = [
-            {"gap_topic": g.gap_topic, "competitor_coverage": g.competitor_coverage}
-            for g in result
-        ]
-        logger.info(f"✅ Identified {len(gaps)} content gaps.")
-        return gaps
+    async def find_gaps_many_async(self, ai_titles, titles_by_competitor, own_title_set=None,
+                                   max_concurrent=config.gap_llm):
+        """
+        One gap call per competitor, all in flight together (at most
+        `max_concurrent`); returns {competitor_url: gaps}. Prefer
+        find_gaps_batch_async unless one combined prompt would grow too long.
+        """
+        own_title_set = own_title_set if own_title_set is not None else title_set(ai_titles)
+        # Embed every title in one request up front rather than once per competitor
+        vectors = await self.embed_titles_async(self._all_titles(ai_titles, titles_by_competitor)) or {}
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def one(url, competitor_titles):
+            async with semaphore:
+                return await self.find_gaps_async(ai_titles, competitor_titles, own_title_set, vectors, url)
+
+        results = await asyncio.gather(*(one(url, t) for url, t in titles_by_competitor.items()),
+                                       return_exceptions=True)
+        gaps_by_competitor = {}
+        for url, result in zip(titles_by_competitor, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Gap analysis failed for {url}: {result}")
+                result = []
+            gaps_by_competitor[url] = result
+        return gaps_by_competitor
+
+    def find_gaps_many(self, ai_titles, titles_by_competitor, own_title_set=None,
+                       mode: Literal["sync", "batch"] = "sync"):
+        """
+        Blocking wrapper around find_gaps_many_async (runs its own event loop).
+        mode="batch" sends every competitor through one Batch API job instead.
+        """
+        if mode == "batch":
+            own_title_set = own_title_set if own_title_set is not None else title_set(ai_titles)
+            vectors = self.embed_titles(self._all_titles(ai_titles, titles_by_competitor))
+            kept = self._prefilter(ai_titles, titles_by_competitor, own_title_set, vectors)
+            return dict(zip(kept, self.submit_batch([(ai_titles, titles) for titles in kept.values()])))
+
+        async def run():
+            # Async connections can't outlive their loop, so this run gets its own transport
+            finder = copy.copy(self)
+            finder.async_client = self.async_client.with_options(http_client=async_http_client())
+            try:
+                return await finder.find_gaps_many_async(ai_titles, titles_by_competitor, own_title_set)
+            finally:
+                await finder.async_client.close()
+
+        return asyncio.run(run())
+
+    def find_gaps(self, ai_titles, competitor_titles, own_title_set=None,
+                  mode: Literal["sync", "batch"] = "sync", competitor_url=None):
+        """
+        High-level method to run analysis and return gaps (mode="batch" goes
+        through the Batch API). Accepts titles or page records (see titles_of);
+        `competitor_url` enables the semantic cache (see make_llm_call).
+        """
+        ai_titles, competitor_titles = titles_of(ai_titles), titles_of(competitor_titles)
+        own_title_set = own_title_set if own_title_set is not None else title_set(ai_titles)
+        vectors = self.embed_titles(self._all_titles(ai_titles, {None: competitor_titles}))
+        competitor_titles = self._prefilter(ai_titles, {None: competitor_titles}, own_title_set, vectors)[None]
+        logger.info(f"Running gap analysis between {len(ai_titles)} own titles and {len(competitor_titles)} competitor titles...")
+
+        if mode == "batch":
+            return self.submit_batch([(ai_titles, competitor_titles)])[0]
+        return self.make_llm_call(ai_titles, competitor_titles, competitor_url=competitor_url)
 
 
 # -----------------------------
@@ -112,4 +683,4 @@ if __name__ == "__main__":
     finder = ContentGapFinder(api_key=OPENAI_API_KEY)
     gaps = finder.find_gaps(ai_titles, competitor_titles)
     # print(gaps)
-    print(json.dumps(gaps, indent=2))
+    print(orjson.dumps(gaps, option=orjson.OPT_INDENT_2).decode("utf-8"))
@@ -0,0 +1,277 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# (value_json, embedding, created_at)
+CacheRow = Tuple[str, Optional[np.ndarray], float]
+
+
+# ==========================================================
+# 🗄️ Storage Backends
+# ==========================================================
+class MemoryCacheBackend:
+    """Process-local dict backend (useful for tests and one-off scripts)."""
+
+    def __init__(self):
+        self._rows: Dict[str, Tuple[str, str, Optional[np.ndarray], float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheRow]:
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        _, value, embedding, created_at = row
+        return value, embedding, created_at
+
+    def set(self, key: str, namespace: str, value: str,
+            embedding: Optional[np.ndarray], created_at: float) -> None:
+        with self._lock:
+            self._rows[key] = (namespace, value, embedding, created_at)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._rows.pop(key, None)
+
+    def iter_embeddings(self, namespace: str) -> Iterator[Tuple[str, np.ndarray, float]]:
+        for key, (ns, _, embedding, created_at) in list(self._rows.items()):
+            if ns == namespace and embedding is not None:
+                yield key, embedding, created_at
+
+
+class SQLiteCacheBackend:
+    """
+    Single-file SQLite backend so cached responses survive across runs and
+    are shared by every process (API workers, CLI runs) using the same file.
+    """
+
+    # Seconds a writer waits for another process's write lock before failing
+    BUSY_TIMEOUT = 30
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=self.BUSY_TIMEOUT)
+        self._lock = threading.Lock()
+        with self._lock:
+            # WAL: readers in other workers don't block on (or block) a writer
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    embedding BLOB,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_namespace ON llm_cache(namespace)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def _to_array(blob: Optional[bytes]) -> Optional[np.ndarray]:
+        return np.frombuffer(blob, dtype=np.float32) if blob else None
+
+    def get(self, key: str) -> Optional[CacheRow]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, embedding, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, blob, created_at = row
+        return value, self._to_array(blob), created_at
+
+    def set(self, key: str, namespace: str, value: str,
+            embedding: Optional[np.ndarray], created_at: float) -> None:
+        blob = embedding.astype(np.float32).tobytes() if embedding is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, namespace, value, embedding, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, value, blob, created_at),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def iter_embeddings(self, namespace: str) -> Iterator[Tuple[str, np.ndarray, float]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, embedding, created_at FROM llm_cache "
+                "WHERE namespace = ? AND embedding IS NOT NULL",
+                (namespace,),
+            ).fetchall()
+        for key, blob, created_at in rows:
+            yield key, self._to_array(blob), created_at
+
+
+# ==========================================================
+# 🧠 LLM Response Cache
+# ==========================================================
+class LLMCache:
+    """
+    Two-tier cache for structured LLM responses.
+
+    1. Exact tier: SHA256 of (prompt, model, schema) -> stored JSON.
+    2. Semantic tier: cosine similarity between the request embedding and
+       stored embeddings in the same namespace (schema); a hit above
+       ``similarity_threshold`` reuses the stored JSON.
+    """
+
+    def __init__(
+        self,
+        backend: str = "sqlite",
+        path: str = "data/llm_cache.sqlite",
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+        similarity_threshold: float = 0.95,
+    ):
+        if backend == "sqlite":
+            self.backend = SQLiteCacheBackend(path)
+        elif backend == "memory":
+            self.backend = MemoryCacheBackend()
+        else:
+            raise ValueError(f"Unknown cache backend: {backend}")
+
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+    # -------------------------------
+    # 🔹 Keys
+    # -------------------------------
+    @staticmethod
+    def make_key(prompt: str, model: str, schema_name: str) -> str:
+        payload = json.dumps(
+            {"prompt": prompt, "model": model, "schema": schema_name}, sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    # -------------------------------
+    # 🔹 Lookups
+    # -------------------------------
+    def get_exact(self, key: str) -> Optional[str]:
+        row = self.backend.get(key)
+        if row is None:
+            return None
+        value, _, created_at = row
+        if self._is_expired(created_at):
+            self.backend.delete(key)
+            return None
+        self.stats["exact_hits"] += 1
+        return value
+
+    def get_semantic(self, namespace: str, embedding: np.ndarray,
+                     threshold: Optional[float] = None) -> Optional[str]:
+        """Best stored response in namespace whose similarity reaches threshold (default: the cache's)."""
+        threshold = self.similarity_threshold if threshold is None else threshold
+        keys, vectors = [], []
+        for key, vector, created_at in self.backend.iter_embeddings(namespace):
+            if self._is_expired(created_at) or vector.shape != embedding.shape:
+                continue
+            keys.append(key)
+            vectors.append(vector)
+
+        if not vectors:
+            return None
+
+        matrix = np.vstack(vectors)
+        matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+        query = embedding / np.linalg.norm(embedding)
+        sims = matrix @ query
+        best = int(np.argmax(sims))
+
+        if sims[best] < threshold:
+            return None
+
+        row = self.backend.get(keys[best])
+        if row is None:
+            return None
+        self.stats["semantic_hits"] += 1
+        logger.info(f"Semantic cache hit (similarity={sims[best]:.3f})")
+        return row[0]
+
+    def record_miss(self) -> None:
+        self.stats["misses"] += 1
+
+    # -------------------------------
+    # 🔹 Writes
+    # -------------------------------
+    def set(self, key: str, namespace: str, value: str,
+            embedding: Optional[np.ndarray] = None) -> None:
+        self.backend.set(key, namespace, value, embedding, time.time())
+
+
+_shared_cache: Optional[LLMCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_llm_cache() -> LLMCache:
+    """
+    Process-wide default cache, so every finder/analyzer/generator built
+    during a run reuses one SQLite connection instead of opening its own.
+    """
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMCache()
+        return _shared_cache
+
+
+# ==========================================================
+# 🧱 Stage Result Cache
+# ==========================================================
+def cached_stage(namespace: str) -> Callable:
+    """
+    Cache a whole pipeline stage's JSON result, keyed on a hash of its inputs.
+
+    Sits above the per-call caches: on a hit the stage also skips its local
+    pre/post-processing (embeddings, clustering, scoring). ``LLM_CACHE_TTL``
+    (seconds, default one day) sets freshness; ``0`` disables it. Empty
+    results are never stored, since stages return ``[]`` on failure.
+    """
+    def decorator(fn: Callable) -> Callable:
+        caches: Dict[float, LLMCache] = {}
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            ttl = float(os.getenv("LLM_CACHE_TTL", 24 * 3600))
+            if ttl <= 0:
+                return fn(*args)
+            cache = caches.get(ttl) or caches.setdefault(ttl, LLMCache(ttl_seconds=ttl))
+
+            inputs = orjson.dumps(args, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+            key = LLMCache.make_key(inputs.decode("utf-8"), fn.__qualname__, namespace)
+            hit = cache.get_exact(key)
+            if hit is not None:
+                logger.info(f"Stage cache hit for '{namespace}'")
+                return orjson.loads(hit)
+            cache.record_miss()
+
+            result = fn(*args)
+            if result:
+                cache.set(key, namespace, orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS).decode("utf-8"))
+            return result
+
+        return wrapper
+
+    return decorator
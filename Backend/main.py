@@ -1,17 +1,23 @@
-from fastapi import FastAPI, HTTPException
+from cachetools import TTLCache
+from contextlib import asynccontextmanager
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import List
+from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
 import logging
+import threading
+import uuid
 from datetime import datetime
 
 from content_pipeline import (
-    run_phase_1_and_2_parallel,
-    run_phase_3_and_4_parallel,
+    run_phases_1_to_4_pipelined,
     run_phase_5
 )
 
 # ⬇️ UPDATE THIS IMPORT TO MATCH YOUR PROJECT PATH
-from models import get_briefs_today  
+from models import briefs_version, ensure_indexes, get_briefs_today
 
 
 # -----------------------------
@@ -23,7 +29,18 @@ logger = logging.getLogger("ContentStrategyAPI")
 # -----------------------------
 # FastAPI App
 # -----------------------------
-app = FastAPI(title="Content Strategy Optimizer API", version="1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Existing databases predate the briefs indexes; a failure here only
+    # costs the index-backed reads, so the API still starts
+    try:
+        await asyncio.to_thread(ensure_indexes)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not ensure database indexes: {e}")
+    yield
+
+
+app = FastAPI(title="Content Strategy Optimizer API", version="1.0", lifespan=lifespan)
 
 # -----------------------------
 # Input Schema
@@ -35,95 +52,179 @@ class PipelineRequest(BaseModel):
 
 
 # -----------------------------
-# RUN PIPELINE ENDPOINT
+# Pipeline Runs (in-process)
 # -----------------------------
-@app.post("/pipeline/run")
-def run_full_pipeline(request: PipelineRequest):
+# task_id -> {"status", "started_at", "completed_at", "result", "error"}
+pipeline_runs: Dict[str, Dict[str, Any]] = {}
+# Finished runs kept for status polling; the oldest are dropped beyond this
+MAX_FINISHED_RUNS = 50
+
+
+def _run_pipeline(request: PipelineRequest) -> Dict[str, Any]:
     """
-    Runs the full content strategy pipeline (all phases) synchronously.
+    Runs the full content strategy pipeline (all phases), blocking.
     Saves briefs to database.
     """
-    try:
-        logger.info("🚀 Starting full content pipeline...")
-        logger.info(f"Our URL: {request.our_url}")
-        logger.info(f"Competitors: {request.competitors}")
-        logger.info(f"Keywords: {request.keywords}")
-
-        # ---- Phase 1 & 2 ----
-        our_details, all_competitor_details, social_data = run_phase_1_and_2_parallel(request.our_url, 
-                                                                                      request.competitors, 
-                                                                                      request.keywords)
-
-        # ---- Phase 3 & 4 ----
-        content_gaps_combined, trending_input = run_phase_3_and_4_parallel(
-            our_details, all_competitor_details, social_data
-        )
-
-        # ---- Phase 5 ---- (DB Save happens inside)
-        brief_result = run_phase_5(content_gaps_combined, trending_input)
-
-        saved_ids = brief_result["saved_brief_ids"]
-        briefs_data = brief_result["briefs"]
-
-        # ---- Prepare response ----
-        result = {
-            "summary": {
-                "own_pages": len(our_details),
-                "competitors_analyzed": len(all_competitor_details),
-                "social_posts_mined": len(social_data),
-                "trending_clusters": len(trending_input),
-                "content_gaps": len(content_gaps_combined),
-                "briefs_generated": len(saved_ids),
-            },
-            "data": {
-                "brief_ids_saved": saved_ids,
-                "content_gaps": content_gaps_combined,
-                "trending_topics": trending_input,
-                "briefs": briefs_data
-            }
+    logger.info("🚀 Starting full content pipeline...")
+    logger.info(f"Our URL: {request.our_url}")
+    logger.info(f"Competitors: {request.competitors}")
+    logger.info(f"Keywords: {request.keywords}")
+
+    # ---- Phase 1-4 (scrapes stream straight into gap analysis) ----
+    (our_details, all_competitor_details, social_data,
+     content_gaps_combined, trending_input) = run_phases_1_to_4_pipelined(request.our_url,
+                                                                          request.competitors,
+                                                                          request.keywords)
+
+    # ---- Phase 5 ---- (DB Save happens inside)
+    brief_result = run_phase_5(content_gaps_combined, trending_input)
+
+    saved_ids = brief_result["saved_brief_ids"]
+    briefs_data = brief_result["briefs"]
+
+    # ---- Prepare response ----
+    return {
+        "summary": {
+            "own_pages": len(our_details),
+            "competitors_analyzed": len(all_competitor_details),
+            "social_posts_mined": len(social_data),
+            "trending_clusters": len(trending_input),
+            "content_gaps": len(content_gaps_combined),
+            "briefs_generated": len(saved_ids),
+        },
+        "data": {
+            "brief_ids_saved": saved_ids,
+            "content_gaps": content_gaps_combined,
+            "trending_topics": trending_input,
+            "briefs": briefs_data
         }
+    }
+
 
-        logger.info("✅ Pipeline completed successfully.")
-        return result
+def _prune_finished_runs():
+    finished = [tid for tid, run in pipeline_runs.items() if run["status"] != "running"]
+    for task_id in finished[:-MAX_FINISHED_RUNS]:
+        del pipeline_runs[task_id]
 
+
+async def execute_pipeline(task_id: str, request: PipelineRequest):
+    """Background task: run the pipeline off the event loop and record the outcome."""
+    run = pipeline_runs[task_id]
+    try:
+        # The phases drive their own event loops, so they get a worker thread
+        # rather than this one; the server keeps answering while they run
+        run["result"] = await asyncio.to_thread(_run_pipeline, request)
+        run["status"] = "completed"
+        logger.info(f"✅ Pipeline {task_id} completed successfully.")
     except Exception as e:
-        logger.exception("❌ Pipeline execution failed.")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.exception(f"❌ Pipeline {task_id} execution failed.")
+        run["status"] = "failed"
+        run["error"] = str(e)
+    finally:
+        run["completed_at"] = datetime.utcnow().isoformat()
+        _prune_finished_runs()
+
+
+# -----------------------------
+# RUN PIPELINE ENDPOINT
+# -----------------------------
+@app.post("/pipeline/run", status_code=202)
+async def run_full_pipeline(request: PipelineRequest, background_tasks: BackgroundTasks):
+    """
+    Starts the full content strategy pipeline in the background and returns
+    a task_id at once; poll /pipeline/status/{task_id} for the result.
+    """
+    # Runs share the tracker and the data/ artifacts, so only one at a time
+    if any(run["status"] == "running" for run in pipeline_runs.values()):
+        raise HTTPException(status_code=409, detail="Another pipeline run is already active.")
+
+    task_id = uuid.uuid4().hex
+    pipeline_runs[task_id] = {
+        "status": "running",
+        "started_at": datetime.utcnow().isoformat(),
+        "completed_at": None,
+        "result": None,
+        "error": None,
+    }
+    background_tasks.add_task(execute_pipeline, task_id, request)
+    return {"task_id": task_id, "status": "running", "status_url": f"/pipeline/status/{task_id}"}
+
+
+@app.get("/pipeline/status/{task_id}")
+async def get_pipeline_status(task_id: str):
+    """Status of a pipeline run; `result` holds the full pipeline response once completed."""
+    run = pipeline_runs.get(task_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Unknown task_id '{task_id}'")
+    return {"task_id": task_id, **run}
 
 
 # -----------------------------
 # NEW API: GET TODAY'S BRIEFS (UPDATED FORMAT)
 # -----------------------------
+# Today's briefs only change when a pipeline run saves new ones
+_today_cache: TTLCache = TTLCache(maxsize=2, ttl=60)
+_today_cache_lock = threading.Lock()
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (t.strip() for t in if_none_match.split(","))
+
+
+def _todays_briefs_response(today) -> tuple:
+    """(response body, ETag) for today's briefs, served from cache until a save or the TTL."""
+    key = (today, briefs_version())
+    with _today_cache_lock:
+        cached = _today_cache.get(key)
+    if cached is not None:
+        return cached
+
+    briefs_data = get_briefs_today(today)
+
+    # Transform to match pipeline response format
+    result = {
+        "summary": {
+            "own_pages": 0,  # Not applicable for today's briefs
+            "competitors_analyzed": 0,  # Not applicable
+            "social_posts_mined": 0,  # Not applicable
+            "trending_clusters": 0,  # Not applicable
+            "content_gaps": 0,  # Not applicable
+            "briefs_generated": len(briefs_data),
+        },
+        "data": {
+            "brief_ids_saved": [b["id"] for b in briefs_data],
+            "content_gaps": [],  # Empty for today's briefs
+            "trending_topics": {},  # Empty for today's briefs
+            "briefs": briefs_data
+        }
+    }
+    # Briefs are insert-only, so the count and newest timestamp identify the set
+    newest = max((b["created_at"] for b in briefs_data), default="")
+    digest = hashlib.md5(f"{today}:{len(briefs_data)}:{newest}".encode("utf-8")).hexdigest()
+    cached = (result, f'W/"{digest}"')
+
+    with _today_cache_lock:
+        _today_cache[key] = cached
+    logger.info(f"✅ Retrieved {len(briefs_data)} briefs for {today}")
+    return cached
+
+
 @app.get("/briefs/today")
-def get_briefs_for_today():
+def get_briefs_for_today(request: Request):
     """
     Fetch all briefs generated today (00:00 to 23:59 UTC).
     Returns data in the same format as /pipeline/run for consistency.
+    Sends an ETag; a matching If-None-Match gets 304 Not Modified.
     """
     try:
         today = datetime.utcnow().date()
-        briefs_data = get_briefs_today(today)
-        
-        # Transform to match pipeline response format
-        result = {
-            "summary": {
-                "own_pages": 0,  # Not applicable for today's briefs
-                "competitors_analyzed": 0,  # Not applicable
-                "social_posts_mined": 0,  # Not applicable
-                "trending_clusters": 0,  # Not applicable
-                "content_gaps": 0,  # Not applicable
-                "briefs_generated": len(briefs_data),
-            },
-            "data": {
-                "brief_ids_saved": [b["id"] for b in briefs_data],
-                "content_gaps": [],  # Empty for today's briefs
-                "trending_topics": {},  # Empty for today's briefs
-                "briefs": briefs_data
-            }
-        }
-        
-        logger.info(f"✅ Retrieved {len(briefs_data)} briefs for {today}")
-        return result
+        result, etag = _todays_briefs_response(today)
+
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        return JSONResponse(result, headers={"ETag": etag})
         
     except Exception as e:
         logger.exception("❌ Failed to retrieve today's briefs.")
@@ -1,13 +1,10 @@
-# from core.database import Base, engine, SessionLocal
-from sqlalchemy import inspect
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
-from datetime import datetime
+import itertools
+from datetime import datetime, timedelta
 
-from core.database import Base
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, insert
+from sqlalchemy.orm import relationship, selectinload
+
+from core.database import Base, SessionLocal, engine
 
 # ==========================================================
 #  MODELS
@@ -27,7 +24,8 @@ class Brief(Base):
     promise = Column(Text)
     cta = Column(Text)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Indexed: get_briefs_today range-scans on it
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
     talking_points = relationship(
         "BriefTalkingPoint",
@@ -40,111 +38,131 @@ class BriefTalkingPoint(Base):
     __tablename__ = "brief_talking_points"
 
     id = Column(Integer, primary_key=True)
-    brief_id = Column(Integer, ForeignKey("briefs.id"))
+    brief_id = Column(Integer, ForeignKey("briefs.id"), index=True)
     talking_point = Column(Text)
 
     brief = relationship("Brief", back_populates="talking_points")
 
 
 # ==========================================================
-#  CREATE TABLES IF NOT EXISTS
+#  SCHEMA UPKEEP
 # ==========================================================
 
-# inspector = inspect(engine)
-
-# needed_tables = {
-#     "briefs": Brief.__table__,
-#     "brief_talking_points": BriefTalkingPoint.__table__,
-# }
-
-# for table_name, table_obj in needed_tables.items():
-#     if table_name not in inspector.get_table_names():
-#         Base.metadata.create_all(bind=engine, tables=[table_obj])
-#         print(f"✅ {table_name} table created successfully.")
-#     else:
-#         print(f"⚠️ {table_name} table already exists.")
+def ensure_indexes():
+    """
+    Create any of the models' indexes missing from an existing database
+    (ix_briefs_created_at, ix_brief_talking_points_brief_id). index=True only
+    reaches tables built by create_all, so the live tables need this; each
+    index is checked for first, like CREATE INDEX IF NOT EXISTS.
+    """
+    with engine.begin() as conn:
+        for table in (Brief.__table__, BriefTalkingPoint.__table__):
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
 
 
 # ==========================================================
 #  SAVE FUNCTION (STORE 1 BRIEF)
 # ==========================================================
 
+def _brief_from_item(item: dict) -> Brief:
+    brief_data = item.get("brief", {})
+    return Brief(
+        source_type=item.get("source_type"),
+        topic=item.get("topic"),
+        priority=item.get("priority"),
+        audience=brief_data.get("audience"),
+        job_to_be_done=brief_data.get("job_to_be_done"),
+        angle=brief_data.get("angle"),
+        promise=brief_data.get("promise"),
+        cta=brief_data.get("cta"),
+    )
+
+
 def save_brief(item: dict):
     """
-    Save a single brief + talking points to database.
+    Save a single brief + talking points to database (one transaction).
     """
-    from core.database import SessionLocal  # local import to avoid circular
+    ids = save_briefs_bulk([item])
+    return ids[0] if ids else None
 
-    db = SessionLocal()
 
-    try:
-        brief_data = item.get("brief", {})
-
-        brief = Brief(
-            source_type=item.get("source_type"),
-            topic=item.get("topic"),
-            priority=item.get("priority"),
-            audience=brief_data.get("audience"),
-            job_to_be_done=brief_data.get("job_to_be_done"),
-            angle=brief_data.get("angle"),
-            promise=brief_data.get("promise"),
-            cta=brief_data.get("cta"),
-        )
+# ==========================================================
+#  SAVE MULTIPLE BRIEFS
+# ==========================================================
+
+# Bumped after every committed save so cached reads (e.g. /briefs/today)
+# know the table changed; next() on a count is atomic under the GIL
+_save_counter = itertools.count(1)
+_briefs_version = 0
 
-        db.add(brief)
-        db.commit()
-        db.refresh(brief)
 
-        # Add talking points
-        for tp in brief_data.get("key_talking_points", []):
-            db.add(BriefTalkingPoint(
-                brief_id=brief.id,
-                talking_point=tp
-            ))
+def briefs_version() -> int:
+    return _briefs_version
 
-        db.commit()
-        print(f"💾 Saved brief ID {brief.id}")
-        return brief.id
+
+def save_briefs_bulk(items: list) -> list:
+    """
+    Save many briefs + talking points in one transaction.
+    Briefs are flushed together to get their PKs, then all talking points
+    go out in a single bulk insert; one commit for the whole batch.
+    """
+    if not items:
+        return []
+
+    try:
+        # Closing the session hands its pooled connection back; begin() commits or rolls back
+        with SessionLocal() as db, db.begin():
+            briefs = [_brief_from_item(item) for item in items]
+            db.add_all(briefs)
+            db.flush()
+
+            talking_points = [
+                {"brief_id": brief.id, "talking_point": tp}
+                for brief, item in zip(briefs, items)
+                for tp in item.get("brief", {}).get("key_talking_points", [])
+            ]
+            if talking_points:
+                # One executemany INSERT (batched by insertmanyvalues), no ORM objects
+                db.execute(insert(BriefTalkingPoint), talking_points)
+
+            # Read PKs before commit expires the instances
+            ids = [brief.id for brief in briefs]
 
     except Exception as e:
         print("❌ DB Error:", e)
-        db.rollback()
-        return None
+        return []
 
-    finally:
-        db.close()
+    global _briefs_version
+    _briefs_version = next(_save_counter)
 
+    print(f"💾 Saved {len(ids)} briefs ({len(talking_points)} talking points)")
+    return ids
 
-# ==========================================================
-#  SAVE MULTIPLE BRIEFS
-# ==========================================================
 
 def save_multiple_briefs(items: list):
-    ids = []
-    for item in items:
-        ids.append(save_brief(item))
-    return ids
-
+    return save_briefs_bulk(items)
 
-from sqlalchemy.orm import Session
-from datetime import datetime
 
-from core.database import SessionLocal
-# from .models import Brief, BriefTalkingPoint
+# ==========================================================
+#  READ BRIEFS
+# ==========================================================
 
 def get_briefs_today(date):
     """
     Fetch all briefs created today, with talking points.
     """
-    db: Session = SessionLocal()
-    try:
-        start = datetime.combine(date, datetime.min.time())
-        end = datetime.combine(date, datetime.max.time())
+    with SessionLocal() as db:
+        # Half-open [midnight, next midnight): a plain range on the indexed
+        # column, where func.date(created_at) would defeat the index
+        start = datetime(date.year, date.month, date.day)
+        end = start + timedelta(days=1)
 
         briefs = (
             db.query(Brief)
-            .filter(Brief.created_at >= start)
-            .filter(Brief.created_at <= end)
+            # All talking points in one extra SELECT ... IN, not one query per brief
+            .options(selectinload(Brief.talking_points))
+            .filter(Brief.created_at >= start, Brief.created_at < end)
             .all()
         )
         print(f"🔍 Fetched {len(briefs)} briefs for {date.isoformat()}")
@@ -169,6 +187,4 @@ def get_briefs_today(date):
             })
 
         return results
-    finally:
-        db.close()
 
@@ -0,0 +1,58 @@
+import importlib.util
+import logging
+import threading
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+logger = logging.getLogger(__name__)
+
+MAX_CONNECTIONS = 20
+LIMITS = httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS)
+# HTTP/2 multiplexes concurrent calls over one TLS connection; needs the optional `h2` package
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+_sync_client: Optional[httpx.Client] = None
+_sync_lock = threading.Lock()
+
+
+# ==========================================================
+# 🔌 Shared OpenAI Transports
+# ==========================================================
+def shared_http_client() -> httpx.Client:
+    """
+    Process-wide sync transport for every blocking OpenAI client.
+
+    Sync clients aren't tied to an event loop, so TrendAnalyzer and
+    ContentGapFinder can reuse the same warm connections from any thread.
+    """
+    global _sync_client
+    with _sync_lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = DefaultHttpxClient(limits=LIMITS, http2=HTTP2)
+        return _sync_client
+
+
+def async_http_client() -> httpx.AsyncClient:
+    """Pooled async transport; create one per event loop (async connections can't cross loops)."""
+    return DefaultAsyncHttpxClient(limits=LIMITS, http2=HTTP2)
+
+
+# ==========================================================
+# 🔥 Connection Warm-up
+# ==========================================================
+def warm_up(client: OpenAI) -> None:
+    """Pay the TLS (and HTTP/2 SETTINGS) handshake now with a cheap GET /v1/models."""
+    try:
+        client.with_options(max_retries=0).models.list()
+    except Exception as e:
+        logger.debug(f"OpenAI warm-up failed: {e}")
+
+
+async def warm_up_async(client: AsyncOpenAI) -> None:
+    """Async variant of warm_up."""
+    try:
+        await client.with_options(max_retries=0).models.list()
+    except Exception as e:
+        logger.debug(f"OpenAI warm-up failed: {e}")
@@ -0,0 +1,80 @@
+import hashlib
+import logging
+import os
+import time
+from typing import List, Optional
+
+import msgpack
+import orjson
+import zstandard
+
+from artifacts import ARTIFACT_EXT, read_artifact, write_msgpack
+from sitemap_agent import Page
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================================
+# 🕸️ Scrape Result Cache
+# ==========================================================
+class ScrapeCache:
+    """
+    On-disk cache of finished site scrapes, one compressed msgpack file per request.
+
+    The key covers everything that shapes a crawl (site, date window,
+    keywords, page/depth limits), so same-day re-runs skip the network
+    entirely. Keyword matching is case-insensitive, so keywords are folded,
+    de-duplicated and sorted first: ``["AI", "ml"]`` and ``["ml", "ai"]``
+    share one entry.
+    """
+
+    def __init__(self, directory: str = "data/cache/sitemap",
+                 ttl_seconds: Optional[float] = 24 * 3600):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def normalize_keywords(keywords: Optional[List[str]]) -> List[str]:
+        return sorted({k.lower() for k in keywords or []})
+
+    @classmethod
+    def make_key(cls, url: str, start_date: str, end_date: str,
+                 keywords: Optional[List[str]], max_pages: int, max_depth: int) -> str:
+        payload = orjson.dumps({
+            "url": url.rstrip("/"),
+            "start": start_date,
+            "end": end_date,
+            "keywords": cls.normalize_keywords(keywords),
+            "max_pages": max_pages,
+            "max_depth": max_depth,
+        }, option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(payload).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{ARTIFACT_EXT}")
+
+    def get(self, key: str) -> Optional[List[Page]]:
+        path = self._path(key)
+        try:
+            if self.ttl_seconds is not None and time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                self.stats["misses"] += 1
+                return None
+            pages = [Page(**item) for item in read_artifact(path)]
+        except FileNotFoundError:
+            self.stats["misses"] += 1
+            return None
+        except (ValueError, TypeError, msgpack.UnpackException, zstandard.ZstdError) as e:
+            logger.warning(f"Discarding unreadable scrape cache entry {key}: {e}")
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return pages
+
+    def set(self, key: str, pages: List[Page]) -> None:
+        # Write-then-rename so a crash mid-write never leaves a truncated entry
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        write_msgpack(tmp, [page.to_dict() for page in pages])
+        os.replace(tmp, path)
@@ -4,13 +4,25 @@ High-Performance Async Web Scraper with Sitemap Discovery and Date Range Filteri
 
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
-import xml.etree.ElementTree as ET
+import heapq
+import itertools
+import lxml.html
+from lxml import etree
 import logging
-from datetime import datetime, time
-from typing import List, Dict, Optional, Set
+import re
+import sys
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from datetime import date, datetime, time, timezone
+from email.utils import parsedate_to_datetime
+from operator import itemgetter
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse
 
+from backoff import TransientHTTPError, backoff_delay, is_transient, parse_retry_after
+from concurrency import parse_pool
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -20,6 +32,182 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Page metadata candidates, in order of preference per field
+_TITLE_KEYS = ('title', 'og:title', 'h1')
+_DESCRIPTION_KEYS = ('description', 'og:description')
+_DATE_KEYS = ('article:published_time', 'publish-date', 'date', 'time')
+# <meta> attribute -> the keys it can fill
+_META_KEYS = {
+    'property': {'og:title', 'og:description', 'article:published_time'},
+    'name': {'description', 'publish-date', 'date'},
+}
+
+
+@lru_cache(maxsize=None)
+def _html_parser(encoding: Optional[str]) -> lxml.html.HTMLParser:
+    # Without an encoding lxml reads <meta charset>; the header wins when sent
+    return lxml.html.HTMLParser(encoding=encoding)
+
+
+def _parse_html(content: bytes, encoding: Optional[str] = None):
+    return lxml.html.document_fromstring(content, parser=_html_parser(encoding))
+
+
+def _extract_meta(doc) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    (title, description, page_date) in one walk over the tree. The first
+    <title>/<h1>/<time> and the first non-empty value of each <meta> are
+    kept; the walk stops once every field's first choice is found.
+    """
+    found: Dict[str, str] = {}
+    for el in doc.iter('title', 'meta', 'h1', 'time'):
+        tag = el.tag
+        if tag == 'meta':
+            value = el.get('content')
+            if not value:
+                continue
+            for attr, keys in _META_KEYS.items():
+                key = el.get(attr)
+                if key in keys and key not in found:
+                    found[key] = value
+        elif tag not in found:
+            if tag == 'time':
+                found[tag] = el.get('datetime') or el.text_content().strip()
+            else:
+                found[tag] = el.text_content().strip()
+        if found.get('title') and 'description' in found and 'article:published_time' in found:
+            break
+    
+    def pick(keys):
+        return next((found[k] for k in keys if found.get(k)), None)
+    
+    return pick(_TITLE_KEYS), pick(_DESCRIPTION_KEYS), pick(_DATE_KEYS)
+
+
+def _parse_page_worker(
+    content: bytes,
+    encoding: Optional[str] = None
+) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    (title, description, page_date) from raw page bytes. Module-level so it
+    can run in the parse process pool, off the event loop.
+    """
+    return _extract_meta(_parse_html(content, encoding))
+
+
+@lru_cache(maxsize=64)
+def _keyword_pattern(keywords: Tuple[str, ...]) -> re.Pattern:
+    """One compiled alternation for all keywords; match against a lowercased URL."""
+    return re.compile('|'.join(re.escape(k.lower()) for k in keywords))
+
+
+@lru_cache(maxsize=100_000)
+def _parse_date_cached(date_str: str, formats: Tuple[str, ...]) -> Optional[datetime]:
+    """
+    Sitemaps repeat the same lastmod strings, and each URL's date is parsed
+    for filtering, sorting and normalizing; every distinct string is parsed once.
+    """
+    # ISO 8601 (the sitemap norm) is parsed in C; strptime is the slow fallback
+    dt = None
+    if date_str[:4].isdigit():
+        try:
+            dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        except ValueError:
+            pass
+    
+    if dt is None:
+        # Clean date string
+        clean_date = date_str.replace('Z', '+0000')
+        
+        for fmt in formats:
+            try:
+                if 'T' in clean_date and 'T' not in fmt:
+                    dt = datetime.strptime(clean_date.split('T')[0], fmt)
+                else:
+                    dt = datetime.strptime(clean_date, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+    
+    # Remove timezone info to ensure consistency
+    return dt.replace(tzinfo=None) if dt.tzinfo is not None else dt
+
+
+# Sitemap entries: <url> in a urlset, <sitemap> in a sitemap index (with or
+# without the sitemaps.org namespace)
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+_SITEMAP_ENTRY_TAGS = (SITEMAP_NS + 'url', 'url', SITEMAP_NS + 'sitemap', 'sitemap')
+# (loc, lastmod) child tags, namespaced and bare, built once
+_NS_FIELD_TAGS = (SITEMAP_NS + 'loc', SITEMAP_NS + 'lastmod')
+_BARE_FIELD_TAGS = ('loc', 'lastmod')
+
+
+class UrlItem(NamedTuple):
+    """A sitemap <url> entry; a tuple, so tens of thousands stay compact."""
+    url: str
+    lastmod: Optional[str]
+
+
+class _SitemapEntries:
+    """
+    Collects sitemap entries from parser events as they arrive.
+    
+    Each entry is cleared once read and dropped from its parent, so a
+    50k-URL sitemap never holds more than one <url> subtree in memory.
+    """
+    __slots__ = ('is_index', 'child_sitemaps', 'urls', '_field_tags')
+    
+    def __init__(self):
+        self.is_index = False
+        self.child_sitemaps: List[str] = []
+        # Keyed by URL: duplicates are dropped as they're read (first wins)
+        self.urls: Dict[str, UrlItem] = {}
+        self._field_tags: Optional[Tuple[str, str]] = None
+    
+    def consume(self, events):
+        for _, el in events:
+            if self._field_tags is None:
+                # The root tag (<sitemapindex> vs <urlset>) says what kind of
+                # sitemap this is; settled once, at the first entry
+                root = el.getparent()
+                self.is_index = root is not None and root.tag.rpartition('}')[2] == 'sitemapindex'
+                self._field_tags = _NS_FIELD_TAGS if el.tag.startswith('{') else _BARE_FIELD_TAGS
+            loc_tag, lastmod_tag = self._field_tags
+            loc = (el.findtext(loc_tag) or '').strip()
+            if self.is_index:
+                if loc:
+                    self.child_sitemaps.append(loc)
+            elif loc and loc not in self.urls:
+                self.urls[loc] = UrlItem(loc, (el.findtext(lastmod_tag) or '').strip() or None)
+            el.clear()
+            while el.getprevious() is not None:
+                del el.getparent()[0]
+    
+    def result(self) -> Tuple[bool, List[str], Dict[str, UrlItem]]:
+        """(is_index, child sitemap URLs, {url: UrlItem})"""
+        return self.is_index, list(dict.fromkeys(self.child_sitemaps)), self.urls
+
+
+@dataclass(slots=True)
+class Page:
+    """A scraped page; slotted so per-field reads skip the dict lookup."""
+    title: str
+    description: str
+    url: str
+    date: str
+    
+    def __post_init__(self):
+        # Titles repeat across pages and sites ("AI Certification"); interning
+        # stores each once and turns later set/dict lookups into pointer compares
+        self.title = sys.intern(self.title.strip())
+    
+    def to_dict(self) -> Dict[str, str]:
+        """Plain dict for JSON dumps."""
+        return asdict(self)
+
+
 class WebScraper:
     """
     High-performance async web scraper with sitemap discovery and date filtering.
@@ -34,16 +222,42 @@ class WebScraper:
         '/sitemap/sitemap.xml',
     ]
     
-    # Date formats for parsing
-    DATE_FORMATS = [
+    # Date formats for parsing (strptime fallbacks after fromisoformat),
+    # split by shape so a value only ever tries formats that could match
+    ISO_DATE_FORMATS = (
         '%Y-%m-%dT%H:%M:%S%z',
         '%Y-%m-%dT%H:%M:%S',
         '%Y-%m-%d',
+    )
+    TEXT_DATE_FORMATS = (
         '%B %d, %Y',
         '%b %d, %Y',
         '%d %B %Y',
         '%d %b %Y',
-    ]
+    )
+    
+    # Error bodies up to this size are read so the socket can be reused
+    DRAIN_MAX_BYTES = 64 * 1024
+    
+    # Sitemap bodies are parsed in chunks of this size as they download
+    SITEMAP_CHUNK_SIZE = 64 * 1024
+    
+    # Parsed (title, description, date) kept per URL; a few hundred bytes each
+    PAGE_CACHE_SIZE = 4096
+    
+    # Pages smaller than this are parsed on the loop; lxml gets through them
+    # in well under a millisecond, less than shipping them to a worker costs
+    INLINE_PARSE_MAX_BYTES = 32 * 1024
+    
+    # Connection reuse: seconds an idle socket is kept, and a resolved host is cached
+    KEEPALIVE_TIMEOUT = 60
+    DNS_CACHE_TTL = 600
+    
+    # With probe_undated, URLs lacking a sitemap lastmod are only probed when
+    # fewer than this share of the matched URLs are dated
+    DATE_COVERAGE_THRESHOLD = 0.9
+    # ...and at most this many times max_pages of them are HEAD-checked
+    PROBE_LIMIT_FACTOR = 4
     
     def __init__(
         self,
@@ -51,36 +265,91 @@ class WebScraper:
         timeout: int = 10,
         max_pages: int = 200,
         max_depth: int = 3,
-        max_concurrent: int = 15
+        max_concurrent: int = 15,
+        probe_undated: bool = False
     ):
         """
         Initialize the WebScraper.
         
         Args:
-            delay: Delay between requests in seconds (for rate limiting)
+            delay: Average spacing between requests to one host, in seconds
+                (a per-host token bucket allowing bursts of max_concurrent; 0 disables)
             timeout: Request timeout in seconds
             max_pages: Maximum number of pages to scrape
             max_depth: Maximum depth for recursive sitemap crawling
-            max_concurrent: Maximum concurrent requests
+            max_concurrent: Maximum concurrent requests per host (private
+                session; a shared session brings its own connector limits)
+            probe_undated: Also consider URLs without a sitemap lastmod when
+                the sitemap is mostly undated; each is HEAD-checked for
+                Last-Modified before its page is fetched
         """
         self.delay = delay
         self.timeout = timeout
         self.max_pages = max_pages
         self.max_depth = max_depth
         self.max_concurrent = max_concurrent
+        self.probe_undated = probe_undated
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        # Applied per request so a shared, externally owned session works too
+        self._request_kwargs = {
+            'headers': self.headers,
+            'timeout': aiohttp.ClientTimeout(total=timeout),
+        }
+        self._page_cache: "OrderedDict[str, Tuple]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Per-host token bucket: host -> (tokens, last refill time)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
         
         logger.info(f"WebScraper initialized (concurrent={max_concurrent}, timeout={timeout}s, max_pages={max_pages})")
     
+    async def _discard(self, response: aiohttp.ClientResponse) -> None:
+        """
+        Drain a small unwanted body. aiohttp closes, rather than pools, any
+        connection whose body was left unread, so the next request to that
+        host would pay a fresh TCP+TLS handshake.
+        """
+        length = response.content_length
+        if length is not None and length <= self.DRAIN_MAX_BYTES:
+            try:
+                await response.read()
+            except Exception:
+                pass
+    
+    async def _throttle(self, url: str) -> None:
+        """
+        Wait for a token from the URL's host bucket. The token is taken up
+        front (the balance may go negative) and the wait happens before a
+        connection is requested, so a throttled host never holds a slot.
+        """
+        if self.delay <= 0:
+            return
+        rate = 1.0 / self.delay
+        host = urlparse(url).netloc
+        now = asyncio.get_running_loop().time()
+        tokens, last = self._buckets.get(host, (float(self.max_concurrent), now))
+        tokens = min(float(self.max_concurrent), tokens + (now - last) * rate) - 1
+        self._buckets[host] = (tokens, now)
+        if tokens < 0:
+            await asyncio.sleep(-tokens / rate)
+    
+    def _pause_host(self, url: str, seconds: float) -> None:
+        """Drain the host's bucket so its next requests wait out a Retry-After."""
+        if self.delay <= 0:
+            return
+        host = urlparse(url).netloc
+        now = asyncio.get_running_loop().time()
+        tokens, _ = self._buckets.get(host, (0.0, now))
+        self._buckets[host] = (min(tokens, 0.0) - seconds / self.delay, now)
+    
     def scrape(
         self,
         homepage_url: str,
         start_date: str,
         end_date: str,
         keywords: Optional[List[str]] = None
-    ) -> List[Dict[str, str]]:
+    ) -> List[Page]:
         """
         Scrape website for pages within date range.
         
@@ -91,19 +360,25 @@ class WebScraper:
             keywords: Optional list of keywords to filter URLs
             
         Returns:
-            List of dictionaries with keys: title, description, url, date
+            List of Page records (title, description, url, date)
         """
         # Run async scraping
-        return asyncio.run(self._scrape_async(homepage_url, start_date, end_date, keywords))
+        return asyncio.run(self.scrape_async(homepage_url, start_date, end_date, keywords))
     
-    async def _scrape_async(
+    async def scrape_async(
         self,
         homepage_url: str,
         start_date: str,
         end_date: str,
-        keywords: Optional[List[str]] = None
-    ) -> List[Dict[str, str]]:
-        """Async implementation of scrape."""
+        keywords: Optional[List[str]] = None,
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> List[Page]:
+        """
+        Async implementation of scrape, for callers already running an event loop.
+        
+        Pass a shared ``session`` to reuse pooled keep-alive connections across
+        scrapes; otherwise a private session is opened and closed here.
+        """
         logger.info(f"Starting scrape for {homepage_url}")
         logger.info(f"Date range: {start_date} to {end_date}")
         logger.info(f"Keywords: {keywords if keywords else 'None (scraping all URLs)'}")
@@ -122,71 +397,94 @@ class WebScraper:
             logger.error(f"Invalid date format: {e}")
             return []
         
-        # Create aiohttp session
-        timeout = aiohttp.ClientTimeout(total=self.timeout)
-        connector = aiohttp.TCPConnector(limit=self.max_concurrent)
-        
-        async with aiohttp.ClientSession(
-            timeout=timeout,
-            connector=connector,
-            headers=self.headers
-        ) as session:
-            # Discover sitemap
-            sitemap_url = await self._discover_sitemap(session, homepage_url)
-            if not sitemap_url:
-                logger.warning(f"No sitemap found for {homepage_url}")
-                return []
-            
-            # Crawl sitemap and extract URLs
-            all_urls = await self._crawl_sitemaps_recursive(session, sitemap_url, depth=0)
-            logger.info(f"Total URLs found in sitemap: {len(all_urls)}")
-            
-            # print(all_urls)
+        if session is not None:
+            return await self._scrape_with_session(session, homepage_url, start_dt, end_dt, keywords)
+        
+        # No shared session: open a private one for this scrape. No global cap
+        # (limit=0): concurrency is bounded per origin, which is what matters
+        # to the sites being crawled, and sitemap fan-out across hosts isn't
+        # serialized behind one pool
+        connector = aiohttp.TCPConnector(
+            limit=0,
+            limit_per_host=self.max_concurrent,
+            # Idle sockets outlive the gap between sitemap crawl and page fetch,
+            # so pages reuse the sitemap's TLS connections
+            keepalive_timeout=self.KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=self.DNS_CACHE_TTL,
+            enable_cleanup_closed=True,
+        )
+        async with aiohttp.ClientSession(connector=connector) as session:
+            return await self._scrape_with_session(session, homepage_url, start_dt, end_dt, keywords)
+    
+    async def _scrape_with_session(
+        self,
+        session: aiohttp.ClientSession,
+        homepage_url: str,
+        start_dt: datetime,
+        end_dt: datetime,
+        keywords: Optional[List[str]]
+    ) -> List[Page]:
+        """Discover, filter and fetch pages using the given session."""
+        # Discover sitemap
+        sitemap_url = await self._discover_sitemap(session, homepage_url)
+        if not sitemap_url:
+            logger.warning(f"No sitemap found for {homepage_url}")
+            return []
+        
+        # Crawl sitemap and extract URLs
+        # Caps sitemap downloads in flight, however wide the index fans out
+        sitemap_slots = asyncio.BoundedSemaphore(self.max_concurrent)
+        all_urls = await self._crawl_sitemaps_recursive(session, sitemap_url, sitemap_slots, depth=0)
+        logger.info(f"Total URLs found in sitemap: {len(all_urls)}")
+        
+        # print(all_urls)
 
-            if not all_urls:
-                logger.warning("No URLs extracted from sitemap")
-                return []
-            
-            # Filter URLs by keywords if provided
-            if keywords:
-                filtered_urls = [u for u in all_urls if self._matches_keywords(u['url'], keywords)]
-                logger.info(f"URLs after keyword filtering: {len(filtered_urls)}")
-            else:
-                filtered_urls = all_urls
-            
-            # Pre-filter by sitemap dates (if available)
-            date_filtered_urls = []
-            no_date_urls = []
-            
-            for url_item in filtered_urls:
-                if url_item.get('lastmod'):
-                    if self._is_in_date_range(url_item['lastmod'], start_dt, end_dt):
-                        date_filtered_urls.append(url_item)
-                else:
-                    no_date_urls.append(url_item)
-            
-            logger.info(f"URLs with dates in range: {len(date_filtered_urls)}")
-            logger.info(f"URLs without sitemap dates (need checking): {len(no_date_urls)}")
-            
-            # Prioritize URLs with dates, then add URLs without dates
-            urls_to_check = date_filtered_urls #+ no_date_urls
-            
-            # Remove duplicates
-            urls_to_check = self._remove_duplicates(urls_to_check)
-            logger.info(f"URLs after deduplication: {len(urls_to_check)}")
-            
-            # Sort by date (newest first)
-            urls_to_check = self._sort_by_date(urls_to_check)
-            
-            # Limit to max_pages
-            urls_to_scrape = urls_to_check[:self.max_pages]
-            logger.info(f"Will scrape {len(urls_to_scrape)} pages")
-            
-            # Fetch page details in parallel
-            results = await self._fetch_all_pages(session, urls_to_scrape, start_dt, end_dt)
-            
-            logger.info(f"Scraping complete. Found {len(results)} pages within date range")
-            return results
+        if not all_urls:
+            logger.warning("No URLs extracted from sitemap")
+            return []
+        
+        # One pass: keyword match, sitemap-date range check; unique already
+        # (entries are keyed by URL) and parsed dates are memoized per string
+        search = _keyword_pattern(tuple(keywords)).search if keywords else None
+        start_day, end_day = start_dt.date(), end_dt.date()
+        matched = 0
+        in_range = []
+        undated = []
+        for url, item in all_urls.items():
+            if search is not None and search(url.lower()) is None:
+                continue
+            matched += 1
+            lastmod = item.lastmod
+            if not lastmod:
+                # Only a request can date these; see _probe_undated
+                undated.append(item)
+                continue
+            dt = self._parse_date(lastmod)
+            if dt is not None and start_day <= dt.date() <= end_day:
+                in_range.append((dt, item))
+        
+        if keywords:
+            logger.info(f"URLs after keyword filtering: {matched}")
+        logger.info(f"URLs with dates in range: {len(in_range)}")
+        logger.info(f"URLs without sitemap dates (need checking): {len(undated)}")
+        
+        # Newest first, limited to max_pages; ties keep sitemap order
+        urls_to_scrape = [item for _, item in heapq.nlargest(self.max_pages, in_range, key=itemgetter(0))]
+        
+        # A mostly dated sitemap is trusted as is; probing its stragglers
+        # would cost a request each for little gain
+        coverage = (matched - len(undated)) / max(1, matched)
+        room = self.max_pages - len(urls_to_scrape)
+        if self.probe_undated and undated and room > 0 and coverage < self.DATE_COVERAGE_THRESHOLD:
+            logger.info(f"Sitemap date coverage {coverage:.0%}; probing {len(undated)} undated URLs")
+            urls_to_scrape += await self._probe_undated(session, undated, start_day, end_day, room)
+        logger.info(f"Will scrape {len(urls_to_scrape)} pages")
+        
+        # Fetch page details in parallel
+        results = await self._fetch_all_pages(session, urls_to_scrape, start_dt, end_dt)
+        
+        logger.info(f"Scraping complete. Found {len(results)} pages within date range")
+        return results
     
     async def _discover_sitemap(
         self,
@@ -209,26 +507,27 @@ class WebScraper:
         parsed = urlparse(homepage_url)
         base_url = f"{parsed.scheme}://{parsed.netloc}"
         
-        # Try common sitemap locations
-        for path in self.SITEMAP_PATHS:
-            sitemap_url = urljoin(base_url, path)
-            logger.debug(f"Trying {sitemap_url}")
-            
-            try:
-                async with session.head(sitemap_url) as response:
-                    if response.status == 200:
-                        logger.info(f"✓ Sitemap found at {sitemap_url}")
-                        return sitemap_url
-            except Exception as e:
-                logger.debug(f"Failed to access {sitemap_url}: {e}")
-                continue
+        # Probe every common sitemap location at once; earlier paths still win
+        probes = [
+            asyncio.ensure_future(self._probe_sitemap(session, urljoin(base_url, path)))
+            for path in self.SITEMAP_PATHS
+        ]
+        try:
+            for probe in probes:
+                sitemap_url = await probe
+                if sitemap_url:
+                    logger.info(f"✓ Sitemap found at {sitemap_url}")
+                    return sitemap_url
+        finally:
+            for probe in probes:
+                probe.cancel()
         
         # Try robots.txt
         robots_url = urljoin(base_url, '/robots.txt')
         logger.debug(f"Checking robots.txt at {robots_url}")
         
         try:
-            async with session.get(robots_url) as response:
+            async with session.get(robots_url, **self._request_kwargs) as response:
                 if response.status == 200:
                     text = await response.text()
                     for line in text.split('\n'):
@@ -236,156 +535,173 @@ class WebScraper:
                             sitemap_url = line.split(':', 1)[1].strip()
                             logger.info(f"✓ Sitemap found in robots.txt: {sitemap_url}")
                             return sitemap_url
+                else:
+                    await self._discard(response)
         except Exception as e:
             logger.debug(f"Failed to check robots.txt: {e}")
         
         logger.warning("No sitemap discovered")
         return None
     
-    async def _fetch_xml(
+    async def _probe_sitemap(self, session: aiohttp.ClientSession, sitemap_url: str) -> Optional[str]:
+        """sitemap_url if a HEAD request for it returns 200, else None."""
+        logger.debug(f"Trying {sitemap_url}")
+        try:
+            async with session.head(sitemap_url, **self._request_kwargs) as response:
+                return sitemap_url if response.status == 200 else None
+        except Exception as e:
+            logger.debug(f"Failed to access {sitemap_url}: {e}")
+            return None
+    
+    async def _fetch_sitemap(
         self,
         session: aiohttp.ClientSession,
         url: str
-    ) -> Optional[ET.Element]:
-        """Fetch and parse XML content."""
+    ) -> Optional[Tuple[bool, List[str], Dict[str, UrlItem]]]:
+        """
+        Fetch a sitemap, parsing it as the bytes arrive; None on failure.
+        
+        Chunks are fed straight into a pull parser, so parsing overlaps the
+        download and the raw document is never buffered whole.
+        """
         try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    content = await response.read()
-                    return ET.fromstring(content)
-                else:
+            async with session.get(url, **self._request_kwargs) as response:
+                if response.status != 200:
                     logger.error(f"Failed to fetch XML from {url}: HTTP {response.status}")
+                    await self._discard(response)
                     return None
+                
+                parser = etree.XMLPullParser(
+                    events=('end',), tag=_SITEMAP_ENTRY_TAGS, resolve_entities=False,
+                )
+                entries = _SitemapEntries()
+                async for chunk in response.content.iter_chunked(self.SITEMAP_CHUNK_SIZE):
+                    parser.feed(chunk)
+                    entries.consume(parser.read_events())
+            
+            # Raises on a truncated or malformed document
+            parser.close()
+            entries.consume(parser.read_events())
+            return entries.result()
         except Exception as e:
             logger.error(f"Failed to fetch XML from {url}: {e}")
             return None
     
-    def _is_sitemap_index(self, root: Optional[ET.Element]) -> bool:
-        """Check if XML is a sitemap index."""
-        if root is None:
-            return False
-        
-        if root.tag.endswith('sitemapindex'):
-            return True
-        
-        for child in root:
-            if child.tag.endswith('sitemap'):
-                return True
-        
-        return False
-    
-    def _extract_sitemap_urls(self, root: ET.Element) -> List[str]:
-        """Extract sitemap URLs from a sitemap index."""
-        sitemap_urls = []
-        
-        # Try with namespace
-        for sitemap in root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}sitemap'):
-            loc = sitemap.find('{http://www.sitemaps.org/schemas/sitemap/0.9}loc')
-            if loc is not None and loc.text:
-                sitemap_urls.append(loc.text)
-        
-        # Try without namespace
-        if not sitemap_urls:
-            for sitemap in root.findall('.//sitemap'):
-                loc = sitemap.find('loc')
-                if loc is not None and loc.text:
-                    sitemap_urls.append(loc.text)
-        
-        return list(set(sitemap_urls))
-    
-    def _extract_urls_from_sitemap(
-        self,
-        root: Optional[ET.Element]
-    ) -> List[Dict[str, Optional[str]]]:
-        """Extract URLs with lastmod dates from a regular sitemap."""
-        if root is None:
-            return []
-        
-        urls = []
-        
-        # Try with namespace
-        for url in root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}url'):
-            loc = url.find('{http://www.sitemaps.org/schemas/sitemap/0.9}loc')
-            lastmod = url.find('{http://www.sitemaps.org/schemas/sitemap/0.9}lastmod')
-            
-            if loc is not None and loc.text:
-                urls.append({
-                    'url': loc.text,
-                    'lastmod': lastmod.text if lastmod is not None and lastmod.text else None
-                })
-        
-        # Try without namespace if no results
-        if not urls:
-            for url in root.findall('.//url'):
-                loc = url.find('loc')
-                lastmod = url.find('lastmod')
-                
-                if loc is not None and loc.text:
-                    urls.append({
-                        'url': loc.text,
-                        'lastmod': lastmod.text if lastmod is not None and lastmod.text else None
-                    })
-        
-        return urls
-    
     async def _crawl_sitemaps_recursive(
         self,
         session: aiohttp.ClientSession,
         sitemap_url: str,
+        slots: asyncio.BoundedSemaphore,
         depth: int = 0
-    ) -> List[Dict[str, Optional[str]]]:
-        """Recursively crawl sitemaps to find all URLs."""
+    ) -> Dict[str, UrlItem]:
+        """
+        Recursively crawl sitemaps to find all URLs, deduplicated by URL.
+        
+        A slot is held only while a sitemap downloads and parses, never
+        across the recursion, so an index waiting on its children can't
+        starve them.
+        """
         if depth > self.max_depth:
             logger.warning(f"Max depth {self.max_depth} reached at {sitemap_url}")
-            return []
+            return {}
         
         indent = "  " * depth
         logger.info(f"{indent}Fetching sitemap (depth={depth}): {sitemap_url}")
         
-        root = await self._fetch_xml(session, sitemap_url)
-        if root is None:
-            return []
+        async with slots:
+            parsed = await self._fetch_sitemap(session, sitemap_url)
+        if parsed is None:
+            return {}
         
-        if self._is_sitemap_index(root):
+        is_index, child_sitemaps, urls = parsed
+        if is_index:
             logger.info(f"{indent}Detected sitemap index")
-            child_sitemaps = self._extract_sitemap_urls(root)
             logger.info(f"{indent}Found {len(child_sitemaps)} child sitemaps")
             
             # Fetch all child sitemaps concurrently
             tasks = [
-                self._crawl_sitemaps_recursive(session, child_url, depth + 1)
+                self._crawl_sitemaps_recursive(session, child_url, slots, depth + 1)
                 for child_url in child_sitemaps
             ]
             
             results = await asyncio.gather(*tasks)
             
-            all_urls = []
+            # Merging dicts dedupes URLs listed in several child sitemaps
+            all_urls = {}
             for child_urls in results:
-                all_urls.extend(child_urls)
+                all_urls.update(child_urls)
             
             return all_urls
         else:
-            urls = self._extract_urls_from_sitemap(root)
             logger.info(f"{indent}Extracted {len(urls)} URLs from sitemap")
             return urls
     
-    def _matches_keywords(self, url: str, keywords: List[str]) -> bool:
-        """Check if URL matches any of the keywords."""
-        url_lower = url.lower()
-        return any(keyword.lower() in url_lower for keyword in keywords)
-    
-    def _remove_duplicates(self, urls: List[Dict]) -> List[Dict]:
-        """Remove duplicate URLs."""
-        seen_urls = set()
-        unique_urls = []
+    async def _probe_undated(
+        self,
+        session: aiohttp.ClientSession,
+        items: List[UrlItem],
+        start_day: date,
+        end_day: date,
+        limit: int
+    ) -> List[UrlItem]:
+        """
+        Undated sitemap URLs worth a full fetch, at most `limit`: those whose
+        Last-Modified header falls in range (newest first), then those that
+        don't send one, leaving it to the page's own date.
         
-        for item in urls:
-            url = item['url']
-            if url not in seen_urls:
-                seen_urls.add(url)
-                unique_urls.append(item)
+        Probed in sitemap order, max_concurrent at a time, stopping once
+        `limit` URLs are kept or PROBE_LIMIT_FACTOR * limit were checked.
+        """
+        candidates = items[:self.PROBE_LIMIT_FACTOR * limit]
+        dated, unknown = [], []
+        for start in range(0, len(candidates), self.max_concurrent):
+            chunk = candidates[start:start + self.max_concurrent]
+            results = await asyncio.gather(*(self._last_modified(session, item.url) for item in chunk))
+            for item, (reachable, dt) in zip(chunk, results):
+                if not reachable:
+                    continue
+                if dt is None:
+                    unknown.append(item)
+                elif start_day <= dt.date() <= end_day:
+                    dated.append((dt, item))
+            if len(dated) + len(unknown) >= limit:
+                break
+        
+        logger.info(f"Undated URLs kept: {len(dated)} by Last-Modified, {len(unknown)} without one")
+        kept = [item for _, item in heapq.nlargest(limit, dated, key=itemgetter(0))]
+        return kept + unknown[:limit - len(kept)]
+    
+    async def _last_modified(
+        self,
+        session: aiohttp.ClientSession,
+        url: str
+    ) -> Tuple[bool, Optional[datetime]]:
+        """
+        (reachable, Last-Modified as a naive UTC datetime) from a HEAD
+        request. Only a 404/410 marks a page unreachable; servers that
+        refuse HEAD or fail transiently leave the decision to the GET.
+        """
+        await self._throttle(url)
+        try:
+            async with session.head(url, allow_redirects=True, **self._request_kwargs) as response:
+                if response.status in (404, 410):
+                    return False, None
+                header = response.headers.get('Last-Modified') if response.status == 200 else None
+        except Exception as e:
+            logger.debug(f"HEAD failed for {url}: {e!r}")
+            return True, None
         
-        return unique_urls
+        if not header:
+            return True, None
+        try:
+            dt = parsedate_to_datetime(header)
+        except (TypeError, ValueError):
+            return True, None
+        return True, dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+    
+    def _matches_keywords(self, url: str, keywords: List[str]) -> bool:
+        """Check if URL matches any of the keywords."""
+        return _keyword_pattern(tuple(keywords)).search(url.lower()) is not None
     
     def _normalize_date(self, date_str: Optional[str]) -> Optional[str]:
         """Normalize date to YYYY-MM-DD format."""
@@ -419,23 +735,22 @@ class WebScraper:
     async def _fetch_all_pages(
         self,
         session: aiohttp.ClientSession,
-        urls: List[Dict],
+        urls: List[UrlItem],
         start_dt: datetime,
         end_dt: datetime
-    ) -> List[Dict[str, str]]:
+    ) -> List[Page]:
         """Fetch all pages concurrently with retry for failed requests."""
         logger.info(f"Fetching details for {len(urls)} pages concurrently...")
         
-        # Create semaphore for rate limiting
-        semaphore = asyncio.Semaphore(self.max_concurrent)
+        # Concurrency is enforced by the session's connector (limit_per_host),
+        # so tasks queue for a connection there rather than on a semaphore
         
-        # Counter for progress tracking
-        counter = {'total': len(urls), 'current': 0}
-        counter_lock = asyncio.Lock()
+        # Progress counter; the event loop is single-threaded, so no lock is needed
+        counter = itertools.count(1)
         
         # Fetch all pages
         tasks = [
-            self._fetch_page_with_semaphore(session, semaphore, url_item, start_dt, end_dt, counter, counter_lock)
+            self._fetch_page_details(session, url_item, start_dt, end_dt, counter, len(urls))
             for url_item in urls
         ]
         
@@ -445,26 +760,32 @@ class WebScraper:
         successful = []
         failed_indices = []
         
+        # None means the page was fetched but skipped, or failed permanently
+        # (e.g. 404); only transient failures (timeouts, 429/5xx) come back
+        # as exceptions and are worth a second try
+        retry_after = None
         for i, result in enumerate(results):
-            if isinstance(result, dict) and result.get('url'):
+            if isinstance(result, Page):
                 successful.append(result)
             elif isinstance(result, Exception):
-                logger.debug(f"Failed request will be retried: {urls[i]['url']}")
-                failed_indices.append(i)
-            elif result is None:
+                logger.debug(f"Failed request will be retried: {urls[i].url}")
                 failed_indices.append(i)
+                if isinstance(result, TransientHTTPError) and result.retry_after is not None:
+                    retry_after = max(retry_after or 0.0, result.retry_after)
         
         logger.info(f"First pass: {len(successful)} successful, {len(failed_indices)} failed")
         
-        # Retry failed requests once
+        # Retry failed requests once, after a jittered backoff
         if failed_indices:
-            logger.info(f"Retrying {len(failed_indices)} failed requests...")
+            delay = backoff_delay(0, retry_after)
+            logger.info(f"Retrying {len(failed_indices)} failed requests in {delay:.1f}s...")
+            await asyncio.sleep(delay)
             
             # Reset counter for retries
-            counter = {'total': len(failed_indices), 'current': 0}
+            counter = itertools.count(1)
             
             retry_tasks = [
-                self._fetch_page_with_semaphore(session, semaphore, urls[i], start_dt, end_dt, counter, counter_lock)
+                self._fetch_page_details(session, urls[i], start_dt, end_dt, counter, len(failed_indices))
                 for i in failed_indices
             ]
             
@@ -472,7 +793,7 @@ class WebScraper:
             
             retry_success = 0
             for result in retry_results:
-                if isinstance(result, dict) and result.get('url'):
+                if isinstance(result, Page):
                     successful.append(result)
                     retry_success += 1
             
@@ -484,192 +805,123 @@ class WebScraper:
         
         return final_results
     
-    async def _fetch_page_with_semaphore(
-        self,
-        session: aiohttp.ClientSession,
-        semaphore: asyncio.Semaphore,
-        url_item: Dict,
-        start_dt: datetime,
-        end_dt: datetime,
-        counter: Dict,
-        counter_lock: asyncio.Lock
-    ) -> Optional[Dict[str, str]]:
-        """Fetch a single page with semaphore for rate limiting."""
-        async with semaphore:
-            result = await self._fetch_page_details(session, url_item, start_dt, end_dt, counter, counter_lock)
-            
-            # Small delay for rate limiting
-            if self.delay > 0:
-                await asyncio.sleep(self.delay)
-            
-            return result
-    
     async def _fetch_page_details(
         self,
         session: aiohttp.ClientSession,
-        url_item: Dict,
+        url_item: UrlItem,
         start_dt: datetime,
         end_dt: datetime,
-        counter: Dict,
-        counter_lock: asyncio.Lock
-    ) -> Optional[Dict[str, str]]:
+        counter: Iterator[int],
+        total: int
+    ) -> Optional[Page]:
         """Fetch details for a single page."""
-        url = url_item['url']
-        sitemap_date = url_item.get('lastmod')
+        url, sitemap_date = url_item
         
-        # Increment counter
-        async with counter_lock:
-            counter['current'] += 1
-            current = counter['current']
-            total = counter['total']
+        current = next(counter)
         
         try:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    logger.debug(f"✗ [{current}/{total}] Failed to fetch {url}: HTTP {response.status}")
-                    return None
-                
-                content = await response.read()
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                # Extract metadata
-                title = self._extract_title(soup)
-
-                # print(f"title extracted: {title}")  # Debugging print
-                # print(f"url being processed: {url}")  # Debugging print
-
-                description = self._extract_description(soup)
-                page_date = self._extract_date(soup)
+            meta = await self._page_meta(session, url)
+            if meta is None:
+                logger.debug(f"✗ [{current}/{total}] Failed to fetch {url}")
+                return None
+            
+            title, description, page_date = meta
+            
+            # Use page date if available, otherwise use sitemap date
+            final_date = page_date or sitemap_date
+            
+            # Check if date is in range
+            if self._is_in_date_range(final_date, start_dt, end_dt):
+                normalized_date = self._normalize_date(final_date)
                 
-                # Use page date if available, otherwise use sitemap date
-                final_date = page_date or sitemap_date
+                # Truncate title for logging
+                title_display = title[:60] if title else 'N/A'
+                logger.info(f"✓ [{current}/{total}] {title_display}... ({normalized_date})")
                 
-                # Check if date is in range
-                if self._is_in_date_range(final_date, start_dt, end_dt):
-                    normalized_date = self._normalize_date(final_date)
-                    
-                    # Truncate title for logging
-                    title_display = title[:60] if title else 'N/A'
-                    logger.info(f"✓ [{current}/{total}] {title_display}... ({normalized_date})")
-                    
-                    return {
-                        'title': title or 'No title found',
-                        'description': description or 'No description found',
-                        'url': url,
-                        'date': normalized_date
-                    }
-                else:
-                    logger.debug(f"✗ [{current}/{total}] Skipped (date outside range or missing)")
-                    return None
+                return Page(
+                    title=title or 'No title found',
+                    description=description or 'No description found',
+                    url=url,
+                    date=normalized_date
+                )
+            else:
+                logger.debug(f"✗ [{current}/{total}] Skipped (date outside range or missing)")
+                return None
                 
         except asyncio.TimeoutError:
             logger.debug(f"✗ [{current}/{total}] Timeout fetching {url}")
-            return None
+            raise
+        except (TransientHTTPError, aiohttp.ClientConnectionError) as e:
+            logger.debug(f"✗ [{current}/{total}] Transient failure for {url}: {e!r}")
+            raise
         except Exception as e:
             logger.debug(f"✗ [{current}/{total}] Error: {e}")
             return None
     
-    def _extract_title(self, soup: BeautifulSoup) -> Optional[str]:
-        """Extract title from page."""
-        # Try <title> tag
-        title_tag = soup.find('title')
-        if title_tag:
-            return title_tag.get_text(strip=True)
-        
-        # Try og:title
-        og_title = soup.find('meta', property='og:title')
-        if og_title and og_title.get('content'):
-            return og_title['content']
-        
-        # Try <h1>
-        h1_tag = soup.find('h1')
-        if h1_tag:
-            return h1_tag.get_text(strip=True)
-        
-        return None
-    
-    def _extract_description(self, soup: BeautifulSoup) -> Optional[str]:
-        """Extract description from page."""
-        # Try meta description
-        desc_meta = soup.find('meta', attrs={'name': 'description'})
-        if desc_meta and desc_meta.get('content'):
-            return desc_meta['content']
-        
-        # Try og:description
-        og_desc = soup.find('meta', property='og:description')
-        if og_desc and og_desc.get('content'):
-            return og_desc['content']
+    async def _page_meta(
+        self,
+        session: aiohttp.ClientSession,
+        url: str
+    ) -> Optional[Tuple[Optional[str], Optional[str], Optional[str]]]:
+        """
+        (title, description, page_date) for a URL, None on a permanent
+        failure (non-200, non-transient); raises TransientHTTPError on 429/5xx.
         
-        return None
+        Parsed pages are memoized (LRU) and concurrent requests for the same
+        URL share one in-flight fetch, so no page is downloaded twice.
+        Failures aren't memoized, leaving them to the retry pass.
+        """
+        meta = self._page_cache.get(url)
+        if meta is not None:
+            self._page_cache.move_to_end(url)
+            return meta
+        
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._load_page_meta(session, url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        # Shielded so one waiter's cancellation doesn't abort the shared fetch
+        return await asyncio.shield(task)
     
-    def _extract_date(self, soup: BeautifulSoup) -> Optional[str]:
-        """Extract date from page."""
-        # Try article:published_time
-        date_meta = soup.find('meta', property='article:published_time')
-        if date_meta and date_meta.get('content'):
-            return date_meta['content']
-        
-        # Try publish-date
-        date_meta = soup.find('meta', attrs={'name': 'publish-date'})
-        if date_meta and date_meta.get('content'):
-            return date_meta['content']
-        
-        # Try date meta tag
-        date_meta = soup.find('meta', attrs={'name': 'date'})
-        if date_meta and date_meta.get('content'):
-            return date_meta['content']
-        
-        # Try <time> tag
-        time_tag = soup.find('time')
-        if time_tag:
-            return time_tag.get('datetime') or time_tag.get_text(strip=True)
-        
-        return None
+    async def _load_page_meta(
+        self,
+        session: aiohttp.ClientSession,
+        url: str
+    ) -> Optional[Tuple[Optional[str], Optional[str], Optional[str]]]:
+        await self._throttle(url)
+        async with session.get(url, **self._request_kwargs) as response:
+            if response.status != 200:
+                logger.debug(f"HTTP {response.status} for {url}")
+                await self._discard(response)
+                if is_transient(response.status):
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    if retry_after:
+                        self._pause_host(url, retry_after)
+                    raise TransientHTTPError(response.status, retry_after)
+                return None
+            content = await response.read()
+            encoding = response.charset
+        
+        # Parsing is CPU-bound; in the pool it overlaps with other pages'
+        # downloads. Small pages parse faster than they'd pickle across
+        if len(content) < self.INLINE_PARSE_MAX_BYTES:
+            meta = _parse_page_worker(content, encoding)
+        else:
+            loop = asyncio.get_running_loop()
+            meta = await loop.run_in_executor(parse_pool(), _parse_page_worker, content, encoding)
+        self._page_cache[url] = meta
+        if len(self._page_cache) > self.PAGE_CACHE_SIZE:
+            self._page_cache.popitem(last=False)
+        return meta
     
-    def _sort_by_date(self, urls: List[Dict]) -> List[Dict]:
-        """Sort URLs by date (newest first)."""
-        urls_with_dates = [u for u in urls if u.get('lastmod')]
-        urls_without_dates = [u for u in urls if not u.get('lastmod')]
-        
-        def get_sort_key(url_item):
-            parsed = self._parse_date(url_item['lastmod'])
-            if parsed is None:
-                # Return minimum datetime (timezone-naive) for invalid dates
-                return datetime.min
-            # Remove timezone info to ensure all datetimes are naive for comparison
-            if parsed.tzinfo is not None:
-                parsed = parsed.replace(tzinfo=None)
-            return parsed
-        
-        urls_with_dates.sort(key=get_sort_key, reverse=True)
-        
-        return urls_with_dates + urls_without_dates
-
     def _parse_date(self, date_str: Optional[str]) -> Optional[datetime]:
-        """Parse date string to datetime object."""
+        """Parse date string to a naive datetime object (memoized per string)."""
         if not date_str:
             return None
-        
-        # Clean date string
-        clean_date = date_str.replace('Z', '+0000')
-        
-        for fmt in self.DATE_FORMATS:
-            try:
-                if 'T' in clean_date and 'T' not in fmt:
-                    clean_date_simple = clean_date.split('T')[0]
-                    dt = datetime.strptime(clean_date_simple, fmt)
-                else:
-                    dt = datetime.strptime(clean_date, fmt)
-                
-                # Remove timezone info to ensure consistency
-                if dt.tzinfo is not None:
-                    dt = dt.replace(tzinfo=None)
-                
-                return dt
-            except:
-                continue
-        
-        return None
+        # ISO values start with the year; textual ones with a month name or day
+        iso = date_str[:4].isdigit()
+        return _parse_date_cached(date_str, self.ISO_DATE_FORMATS if iso else self.TEXT_DATE_FORMATS)
 
 
 # Example usage
@@ -697,10 +949,10 @@ if __name__ == "__main__":
     print('='*80)
     print(f"our own titles {results}")
     for result in results[:5]:
-        print(f"\nTitle: {result['title']}")
-        print(f"Date: {result['date']}")
-        print(f"URL: {result['url']}")
-        print(f"Description: {result['description'][:100]}...")
+        print(f"\nTitle: {result.title}")
+        print(f"Date: {result.date}")
+        print(f"URL: {result.url}")
+        print(f"Description: {result.description[:100]}...")
 
 # # Scrape website
     # results = scraper.scrape(
@@ -1,10 +1,11 @@
 #social_trend_miner.py for reddit
+import asyncio
 import json
 import logging
 from datetime import datetime
-import praw
-from prawcore.exceptions import NotFound, Forbidden, ResponseException
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import aiohttp
+
+from backoff import backoff_delay, is_transient, parse_retry_after
 
 # -----------------------------
 # LOGGING CONFIGURATION
@@ -17,122 +18,175 @@ logger = logging.getLogger("RedditTrendMiner")
 
 
 # -----------------------------
-# CLASS: RedditTrendMiner
+# CLASS: AsyncRedditTrendMiner
 # -----------------------------
-class RedditTrendMiner:
-    def __init__(self, client_id: str, client_secret: str, user_agent: str, max_workers: int = 10):
+class AsyncRedditTrendMiner:
+    """
+    Talks to Reddit's OAuth REST API directly over aiohttp so it can share
+    the pipeline's event loop and connection pool instead of blocking
+    worker threads.
+    """
+    TOKEN_URL = "https://www.reddit.com/api/v1/access_token"
+    API_BASE = "https://oauth.reddit.com"
+
+    MAX_ATTEMPTS = 4
+
+    def __init__(self, client_id: str, client_secret: str, user_agent: str, max_concurrent: int = 10):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.user_agent = user_agent
+        self.max_concurrent = max_concurrent
+        self._headers = None
+        logger.info(f"✅ {type(self).__name__} initialized successfully")
+
+    # -------------------------
+    # AUTH (app-only OAuth)
+    # -------------------------
+    async def _authenticate(self, session: aiohttp.ClientSession):
+        async with session.post(
+            self.TOKEN_URL,
+            auth=aiohttp.BasicAuth(self.client_id, self.client_secret),
+            data={"grant_type": "client_credentials"},
+            headers={"User-Agent": self.user_agent},
+        ) as resp:
+            resp.raise_for_status()
+            token = (await resp.json())["access_token"]
+        self._headers = {"Authorization": f"bearer {token}", "User-Agent": self.user_agent}
+
+    async def _get_json(self, session: aiohttp.ClientSession, path: str, params: dict):
         """
-        Initialize RedditTrendMiner with Reddit API credentials.
+        GET an OAuth endpoint; returns (status, json) with json=None on 403/404.
+
+        429/5xx and connection errors are retried with jittered exponential
+        backoff (honouring Retry-After); any other error status raises at once.
         """
-        self.reddit = praw.Reddit(
-            client_id=client_id,
-            client_secret=client_secret,
-            user_agent=user_agent
-        )
-        self.max_workers = max_workers
-        logger.info("✅ RedditTrendMiner initialized successfully")
+        for attempt in range(self.MAX_ATTEMPTS):
+            last = attempt == self.MAX_ATTEMPTS - 1
+            try:
+                async with session.get(f"{self.API_BASE}{path}", params=params, headers=self._headers) as resp:
+                    if resp.status in (403, 404):
+                        return resp.status, None
+                    if not is_transient(resp.status) or last:
+                        resp.raise_for_status()
+                        return resp.status, await resp.json()
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    reason = f"HTTP {resp.status}"
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if last:
+                    raise
+                retry_after, reason = None, repr(e)
+            delay = backoff_delay(attempt, retry_after)
+            logger.warning(f"{reason} for {path}; retrying in {delay:.1f}s ({attempt + 1}/{self.MAX_ATTEMPTS})")
+            await asyncio.sleep(delay)
 
     # -------------------------
     # SEARCH SUBREDDITS BY KEYWORD
     # -------------------------
-    def search_subreddits_by_keyword(self, keyword: str, limit: int = 10):
-        subs = []
+    async def search_subreddits_by_keyword(self, session: aiohttp.ClientSession, keyword: str, limit: int = 10):
         try:
-            for sub in self.reddit.subreddits.search(keyword, limit=limit):
-                subs.append(sub.display_name)
+            _, data = await self._get_json(session, "/subreddits/search", {"q": keyword, "limit": limit})
+            if data is None:
+                return []
+            return [child["data"]["display_name"] for child in data["data"]["children"]][:limit]
         except Exception as e:
             logger.error(f"Error searching subreddits for '{keyword}': {e}")
-        return subs
+            return []
 
     # -------------------------
     # FETCH POSTS FROM SUBREDDIT
     # -------------------------
-    def fetch_subreddit_posts(self, subreddit_name: str, start_date: datetime, end_date: datetime, posts_limit: int = 50):
+    async def fetch_subreddit_posts(self, session: aiohttp.ClientSession, subreddit_name: str,
+                                    start_date: datetime, end_date: datetime, posts_limit: int = 50):
+        # Normalize to start and end of the day
+        start_ts = int(datetime.combine(start_date.date(), datetime.min.time()).timestamp())
+        end_ts = int(datetime.combine(end_date.date(), datetime.max.time()).timestamp())
+
         try:
-            subreddit = self.reddit.subreddit(subreddit_name)
-            _ = subreddit.display_name  # Verify subreddit exists
-            
-            # Normalize to start and end of the day
-            start_date = datetime.combine(start_date.date(), datetime.min.time())  # 00:00:00
-            end_date = datetime.combine(end_date.date(), datetime.max.time())      # 23:59:59
-
-            start_ts = int(start_date.timestamp())
-            end_ts = int(end_date.timestamp())
-
-            posts = []
-            for post in subreddit.new(limit=posts_limit):
-                # print(f"{start_ts} <= {post.created_utc} <= {end_ts}")
-                if start_ts <= post.created_utc <= end_ts:
-                    posts.append({
-                        "id": post.id,
-                        "title": post.title,
-                        "selftext": post.selftext,
-                        "score": post.score,
-                        "ups": post.ups,
-                        "downs": post.downs,
-                        "comments": post.num_comments,
-                        "created_utc": datetime.fromtimestamp(post.created_utc).strftime("%Y-%m-%d %H:%M:%S"),
-                        "subreddit": str(post.subreddit),
-                        "url": f"https://www.reddit.com{post.permalink}"
-                    })
-
-            logger.info(f"Fetched {len(posts)} posts from r/{subreddit_name}")
-            return posts
-
-        except NotFound:
+            status, data = await self._get_json(session, f"/r/{subreddit_name}/new", {"limit": posts_limit, "raw_json": 1})
+        except Exception as e:
+            logger.error(f"Unexpected error for r/{subreddit_name}: {e}")
+            return []
+        if status == 404:
             logger.warning(f"Subreddit r/{subreddit_name} not found or is private")
             return []
-        except Forbidden:
+        if status == 403:
             logger.warning(f"Access forbidden to r/{subreddit_name}")
             return []
-        except ResponseException as e:
-            logger.error(f"API error for r/{subreddit_name}: {e}")
-            return []
-        except Exception as e:
-            logger.error(f"Unexpected error for r/{subreddit_name}: {e}")
-            return []
+
+        posts = []
+        for child in data["data"]["children"]:
+            post = child["data"]
+            if start_ts <= post["created_utc"] <= end_ts:
+                posts.append({
+                    "id": post["id"],
+                    "title": post["title"],
+                    "selftext": post.get("selftext", ""),
+                    "score": post.get("score", 0),
+                    "ups": post.get("ups", 0),
+                    "downs": post.get("downs", 0),
+                    "comments": post.get("num_comments", 0),
+                    "created_utc": datetime.fromtimestamp(post["created_utc"]).strftime("%Y-%m-%d %H:%M:%S"),
+                    "subreddit": post["subreddit"],
+                    "url": f"https://www.reddit.com{post['permalink']}"
+                })
+
+        logger.info(f"Fetched {len(posts)} posts from r/{subreddit_name}")
+        return posts
 
     # -------------------------
-    # RUN METHOD (PARALLEL)
+    # RUN METHOD (ASYNC)
     # -------------------------
-    def run(self, keywords, start_date, end_date, posts_limit=50, top_subs=5, output_file="social_trends_raw.json"):
+    async def run_async(self, keywords, start_date, end_date, posts_limit=50, top_subs=5,
+                        session: aiohttp.ClientSession = None):
         """
-        Run trend mining across multiple subreddits in parallel.
+        Run trend mining across multiple subreddits concurrently.
+        Pass the pipeline's shared ``session`` to reuse its connection pool.
         """
-        all_posts = []
-        subreddit_tasks = []
+        if session is None:
+            async with aiohttp.ClientSession() as own_session:
+                return await self.run_async(keywords, start_date, end_date, posts_limit, top_subs, own_session)
+
+        await self._authenticate(session)
+        sem = asyncio.Semaphore(self.max_concurrent)
+
+        async def bounded(coro):
+            async with sem:
+                return await coro
 
         # Step 1: Collect all subreddits for all keywords
         logger.info("🔍 Searching subreddits for keywords...")
         logger.info(f"Keywords: {keywords}")
-        
-        for keyword in keywords:
-            subs = self.search_subreddits_by_keyword(keyword, limit=top_subs)
+        subs_per_keyword = await asyncio.gather(
+            *(bounded(self.search_subreddits_by_keyword(session, kw, limit=top_subs)) for kw in keywords)
+        )
+        subreddit_tasks = []
+        for keyword, subs in zip(keywords, subs_per_keyword):
             logger.info(f"Subreddits for '{keyword}': {subs}")
-            for sub in subs:
-                subreddit_tasks.append((sub, start_date, end_date, posts_limit))
+            subreddit_tasks.extend(subs)
 
-        # Step 2: Parallel fetching using ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_sub = {
-                executor.submit(self.fetch_subreddit_posts, sub, s, e, limit): sub
-                for (sub, s, e, limit) in subreddit_tasks
-            }
+        # Step 2: Fetch every subreddit once, concurrently (bounded); keywords often share subs
+        results = await asyncio.gather(
+            *(bounded(self.fetch_subreddit_posts(session, sub, start_date, end_date, posts_limit))
+              for sub in dict.fromkeys(subreddit_tasks))
+        )
+        return [post for posts in results for post in posts]
 
-            for future in as_completed(future_to_sub):
-                sub_name = future_to_sub[future]
-                try:
-                    posts = future.result()
-                    all_posts.extend(posts)
-                except Exception as e:
-                    logger.error(f"Error processing r/{sub_name}: {e}")
 
-        # Step 3: Save all results
-        # with open(output_file, "w", encoding="utf-8") as f:
-        #     json.dump(all_posts, f, indent=2, ensure_ascii=False)
+# -----------------------------
+# CLASS: RedditTrendMiner
+# -----------------------------
+class RedditTrendMiner(AsyncRedditTrendMiner):
+    """
+    Blocking entry point for scripts; runs AsyncRedditTrendMiner on its own
+    event loop. Concurrency is bounded by ``max_concurrent`` requests
+    rather than a pool of PRAW worker threads.
+    """
 
-        # logger.info(f"✅ Saved {len(all_posts)} posts to {output_file}")
-        return all_posts
+    # -------------------------
+    # RUN METHOD (BLOCKING)
+    # -------------------------
+    def run(self, keywords, start_date, end_date, posts_limit=50, top_subs=5):
+        return asyncio.run(self.run_async(keywords, start_date, end_date, posts_limit, top_subs))
 
 
 # -----------------------------
@@ -143,7 +197,7 @@ if __name__ == "__main__":
         client_id="ydYRJCnXguV_6gTnnNjmww",
         client_secret="I-dyOgNW3dFKu8jWjemWDd6hPqvkFw",
         user_agent="AICertsContentAgent/1.0",
-        max_workers=10  # adjust threads here
+        max_concurrent=10  # in-flight Reddit requests
     )
 
     keywords = ["Machine Learning", "AI", "DataScience"]
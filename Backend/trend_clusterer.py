@@ -4,16 +4,27 @@ import logging
 from datetime import datetime
 from openai import OpenAI
 from pydantic import BaseModel
-from typing import List
+from typing import List, Literal, Optional
 import numpy as np
 import matplotlib.pyplot as plt
 
 import os
 from dotenv import load_dotenv
+
+from artifacts import intermediate_path, write_msgpack
+from backoff import EmptyResponseError, retry_openai
+from concurrency import cpu_pool
+from llm_cache import LLMCache, shared_llm_cache
+from openai_http import shared_http_client
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Relevance scoring parses every post's timestamp in pure Python; past this
+# many posts it runs on the shared CPU pool so it doesn't hold the GIL while
+# gap analysis is in flight. Below it, pickling the posts costs more.
+CPU_POOL_MIN_POSTS = 5000
+
 
 class Cluster(BaseModel):
     cluster_name: str
@@ -24,7 +35,191 @@ class ClusteredOutput(BaseModel):
     clusters: List[Cluster]
 
 
+# ===============================
+# Prompt Templates
+# ===============================
+# "concise": technically precise 2-10 word cluster names.
+# "detailed": information-dense 5-15 word names listing concrete models,
+# companies and events, for marketing readers.
+_SUBREDDIT_PROMPT_CONCISE = """
+You are a research assistant specializing in thematic analysis of social media content.
+
+Task: Analyze these post titles from r/{subreddit_name} and group them into meaningful topic clusters.
+
+Instructions:
+1. Identify common themes, technologies, concepts, or discussion topics
+2. Group similar titles together into clusters
+3. Create descriptive cluster names (2-5 words)
+4. Ensure each title is assigned to exactly one cluster
+5. Aim for 5-15 clusters depending on content diversity
+6. Focus on substantive themes, not superficial similarities
+
+Cluster names must be highly specific and include at least one explicit technical identifier, such as:
+- a model type or architecture (e.g., LLMs, Transformers, LaBSE, OOD models)
+- a technique or method (e.g., fine-tuning, post-training, recursive reasoning, structured memory)
+- a framework or technology (e.g., CUDA, ONNX Runtime, JetBrains PSI)
+- a domain or research area (e.g., academic publishing workflow, neurosymbolic AI, AI governance)
+
+Cluster names must be 2–10 words, technically precise, and uniquely descriptive of the cluster’s thematic scope.
+Do NOT use generic categories like “AI Tools”, “Machine Learning Research”, or “AI Ethics”.
+
+
+Titles to analyze:
+{titles_json}
+"""
+
+_SUBREDDIT_PROMPT_DETAILED = """
+You are a research assistant specializing in thematic analysis of social media content.
+
+Task: Analyze these post titles from r/{subreddit_name} and group them into meaningful topic clusters.
+
+Instructions:
+1. Identify common themes, technologies, concepts, or discussion topics
+2. Group similar titles together into clusters
+3. Create descriptive cluster names (2-5 words)
+4. Ensure each title is assigned to exactly one cluster
+5. Aim for 5-15 clusters depending on content diversity
+6. Focus on substantive themes, not superficial similarities
+
+Titles to analyze:
+{titles_json}
+"""
+
+_CLUSTER_PROMPT_CONCISE = """
+You are a research assistant specializing in thematic analysis of social media content.
+
+Task: Analyze the provided post titles and organize them into meaningful, technically-specific topic clusters.
+
+Instructions:
+1. Identify common themes, technologies, methodologies, research areas, or discussion topics across the titles.
+2. Group semantically similar titles together into coherent clusters.
+3. Create highly specific, technically descriptive cluster names (2-10 words).
+4. Ensure each title is assigned to exactly one cluster.
+5. Aim for 5-15 clusters depending on the diversity and granularity of the content.
+6. Prioritize substantive thematic groupings over superficial keyword matches.
+
+Cluster Naming Requirements:
+Cluster names MUST be technically precise and include at least one explicit identifier from the following categories:
+- Model architectures or types (e.g., "LLMs", "Transformers", "Qwen2.5-Omni", "Diffusion Models")
+- Specific techniques or methods (e.g., "Fine-tuning", "Post-training", "Recursive Reasoning", "Attention Mechanisms", "RAG")
+- Frameworks, libraries, or technologies (e.g., "CUDA", "ONNX Runtime", "PyTorch", "JetBrains PSI", "TensorFlow")
+- Research domains or application areas (e.g., "Academic Publishing Workflow", "Neurosymbolic AI", "Biosignal Synthesis", "AI Governance")
+- Specific platforms or products (e.g., "Azure AI", "Gemini 3", "Claude API", "Perplexity")
+
+Cluster Name Standards:
+- Length: 2-10 words
+- Style: Technically precise and immediately informative
+- Uniqueness: Each cluster name should clearly distinguish its thematic scope from others
+- Avoid generic categories such as "AI Tools", "Machine Learning Research", "AI Applications", "AI Ethics", or "AI Development"
+
+Exclusion Rule:
+Completely exclude and do not cluster titles that are:
+- Meaningless or nonsensical
+- Meme-based or purely humorous content
+- Pop culture references without technical substance
+- Low-information or off-topic posts
+- Random personal anecdotes unrelated to technical content
+
+Do NOT create clusters for excluded content. Do NOT include such titles in any cluster. Simply omit them from the output entirely.
+
+Output Format:
+Return a JSON array of cluster objects. Each object should contain:
+- "cluster_name": A technically specific descriptive name following the naming requirements above
+- "titles": An array of post titles belonging to this cluster
+
+Titles to Analyze:
+{titles_json}
+
+Important: Only include titles that have genuine technical or professional content. Exclude all meme posts, jokes, and irrelevant content from your clustering entirely.
+"""
+
+_CLUSTER_PROMPT_DETAILED = """
+You are a research assistant specializing in thematic analysis of social media content for marketing intelligence.
+
+Task: Analyze the provided post titles and organize them into meaningful topic clusters with highly informative, detail-rich cluster names.
+
+Core Objective:
+Create cluster names that serve as comprehensive summaries, enabling anyone to understand the cluster's complete scope without reading individual titles. Marketing teams should immediately grasp what specific technologies, models, companies, events, or topics are being discussed.
+
+Instructions:
+1. Identify common themes, technologies, methodologies, research areas, or discussion topics across the titles.
+2. Group semantically similar titles together into coherent clusters.
+3. Create information-dense cluster names (5-15 words) that capture ALL key specific details within the cluster.
+4. Ensure each title is assigned to exactly one cluster.
+5. Aim for 5-15 clusters depending on the diversity and granularity of the content.
+6. Prioritize substantive thematic groupings over superficial keyword matches.
+
+Cluster Naming Requirements (CRITICAL):
+Cluster names MUST include specific, concrete identifiers that appear in the titles:
+
+1. **Specific Model Names**: Never say "AI models" - say "Gemini 3, Claude on Azure, Qwen2.5-Omni"
+2. **Specific Companies/Platforms**: Never say "tech companies" - say "Google, Microsoft Azure, Anthropic"
+3. **Specific Technologies/Frameworks**: Never say "ML frameworks" - say "ONNX Runtime, CUDA, PyTorch, JetBrains PSI"
+4. **Specific Job Roles/Companies**: Never say "data science jobs" - say "Marsh McLennan DS Internship, Expedia ML Scientist, Senior DS Interviews"
+5. **Specific Events/Announcements**: Never say "recent developments" - say "Cloudflare Outage November 2025, Gemini 3 Launch, Tsinghua ICLR Paper Withdrawal"
+6. **Specific Techniques/Methods**: Never say "training methods" - say "Post-training, Fine-tuning Multimodal LLMs, ONNX+CUDA GPU Acceleration"
+7. **Specific Research Venues**: Never say "academic publishing" - say "arXiv Upload Timing, ACL/EMNLP Workshop Publications, ICLR Submissions"
+8. **Specific Applications**: Never say "AI applications" - say "ECG Biosignal Synthesis, Invoice/Contract Data Extraction, Clean Water Access Solutions"
+
+Cluster Name Construction Guidelines:
+- Length: 5-15 words (prioritize completeness over brevity)
+- Include ALL key specific nouns from the cluster (model names, company names, technologies, events)
+- Use commas or "and" to list multiple specific items: "Gemini 3, Claude Azure Integration, and Qwen2.5-Omni Multimodal Fine-tuning"
+- Be explicit: "Microsoft-Anthropic Partnership Bringing Claude to Azure" not "New AI Partnerships"
+- Capture concrete details: "Marsh McLennan and Expedia DS/ML Interview Preparation and Career Transitions" not "Data Science Career Opportunities"
+- If discussing techniques, name them: "LLM Post-training, Qwen2.5-Omni Multimodal Fine-tuning, and ONNX Runtime GPU Optimization"
+
+Examples of Good vs Bad Cluster Names:
+- ❌ BAD: "AI Model Development and Fine-Tuning"
+- ✅ GOOD: "LLM Post-training and Qwen2.5-Omni Multimodal Fine-tuning with ONNX Runtime CUDA"
+
+- ❌ BAD: "AI News and Developments"  
+- ✅ GOOD: "Google Gemini 3 Launch, Microsoft-Anthropic Claude Azure Partnership, November 2025 Updates"
+
+- ❌ BAD: "Career and Opportunities in AI"
+- ✅ GOOD: "Marsh McLennan DS Internship, Expedia ML Scientist, Senior DS Interview Preparation, Backend to AI/ML Transitions"
+
+- ❌ BAD: "AI Research and Papers"
+- ✅ GOOD: "arXiv Upload Timing, ACL/EMNLP Workshop Publishing, Tsinghua ICLR Citation Integrity, OpenCodePapers Platform"
+
+- ❌ BAD: "AI in Industry and Society"
+- ✅ GOOD: "Anthropic CEO on AI Risk Disclosure, Google Sundar Pichai on AI Bubble and Job Automation, E-commerce Impact"
+
+Exclusion Rule:
+Completely exclude and do not cluster titles that are:
+- Meaningless or nonsensical
+- Meme-based or purely humorous content
+- Pop culture references without technical substance
+- Low-information or off-topic posts (e.g., "What if city was made of yarn?", "😬", "Pirate Booty")
+- Random personal anecdotes unrelated to technical content
+
+Do NOT create clusters for excluded content. Do NOT include such titles in any cluster. Simply omit them from the output entirely.
+
+Output Format:
+Return a JSON array of cluster objects. Each object should contain:
+- "cluster_name": An information-dense, specific name capturing all key details (5-15 words)
+- "titles": An array of post titles belonging to this cluster
+
+Titles to Analyze:
+{titles_json}
+
+Critical Reminder: Marketing teams will use these cluster names for strategic planning. They need to see EXACTLY which models, companies, technologies, events, and roles are being discussed - not generic categories. Make every word in the cluster name count by being specific and concrete.
+"""
+
+def _titles_json(titles) -> str:
+    # Read by the model, not people: no indentation, and non-ASCII titles
+    # stay as-is rather than \uXXXX escapes (both only cost tokens)
+    return json.dumps(titles, ensure_ascii=False, separators=(",", ":"))
+
+
+_PROMPTS = {
+    "concise": (_SUBREDDIT_PROMPT_CONCISE, _CLUSTER_PROMPT_CONCISE),
+    "detailed": (_SUBREDDIT_PROMPT_DETAILED, _CLUSTER_PROMPT_DETAILED),
+}
+
+
 class TrendAnalyzer:
+    MODEL = "gpt-4o-2024-08-06"
     WINDOW_DAYS = 14
     WEIGHTS = {
         "engagement": 0.4,
@@ -32,10 +227,16 @@ class TrendAnalyzer:
         "frequency": 0.25
     }
 
-    def __init__(self, api_key: str):
-        """Initialize with OpenAI API key."""
-        self.client = OpenAI(api_key=api_key)
-        logger.info("TrendAnalyzer initialized with provided API key.")
+    def __init__(self, api_key: str, prompt_style: Literal["concise", "detailed"] = "concise",
+                 cache: Optional[LLMCache] = None, use_cache: bool = True):
+        """Initialize with OpenAI API key and the cluster-naming prompt style."""
+        if prompt_style not in _PROMPTS:
+            raise ValueError(f"Unknown prompt_style: {prompt_style}")
+        # Retries (with backoff) are make_llm_call's job, not the SDK's
+        self.client = OpenAI(api_key=api_key, http_client=shared_http_client(), max_retries=0)
+        self.cache = (cache or shared_llm_cache()) if use_cache else None
+        self._subreddit_prompt, self._cluster_prompt = _PROMPTS[prompt_style]
+        logger.info(f"TrendAnalyzer initialized with provided API key (prompt_style={prompt_style}).")
 
     # ===============================
     # Elbow Method
@@ -116,27 +317,36 @@ class TrendAnalyzer:
             return None
 
     def make_llm_call(self, prompt, response_model, max_retries=3):
-        """Standardized LLM call with retry logic."""
-        for attempt in range(max_retries):
-            try:
-                response = self.client.responses.parse(
-                    model="gpt-4o-2024-08-06",
-                    input=[{"role": "user", "content": prompt}],
-                    text_format=response_model,
-                    temperature=0.2
-                )
+        """Standardized LLM call with retry logic (served from the response cache on repeat prompts)."""
+        key = None
+        if self.cache is not None:
+            key = LLMCache.make_key(prompt, self.MODEL, response_model.__name__)
+            hit = self.cache.get_exact(key)
+            if hit is not None:
+                return response_model.model_validate_json(hit)
+            self.cache.record_miss()
 
-                parsed = getattr(response, "output_parsed", None)
-                if parsed is not None:
-                    return parsed
-
-                logger.warning(f"Retry {attempt+1}/{max_retries}: no parsed output")
+        try:
+            parsed = retry_openai(max_retries)(self._parse_once)(prompt, response_model)
+        except Exception as e:
+            logger.error(f"Failed to get valid LLM response: {e}")
+            return None
 
-            except Exception as e:
-                logger.warning(f"Retry {attempt+1}/{max_retries}: API error: {e}")
+        if key is not None:
+            self.cache.set(key, response_model.__name__, parsed.model_dump_json())
+        return parsed
 
-        logger.error("Failed to get valid LLM response after all retries")
-        return None
+    def _parse_once(self, prompt, response_model):
+        response = self.client.responses.parse(
+            model=self.MODEL,
+            input=[{"role": "user", "content": prompt}],
+            text_format=response_model,
+            temperature=0.2
+        )
+        parsed = getattr(response, "output_parsed", None)
+        if parsed is None:
+            raise EmptyResponseError("no parsed output")
+        return parsed
 
     # ===============================
     # Subreddit-wise Processing (Optional)
@@ -172,32 +382,9 @@ class TrendAnalyzer:
         """
         titles = [post["title"] for post in posts]
         
-        prompt = f"""
-You are a research assistant specializing in thematic analysis of social media content.
-
-Task: Analyze these post titles from r/{subreddit_name} and group them into meaningful topic clusters.
-
-Instructions:
-1. Identify common themes, technologies, concepts, or discussion topics
-2. Group similar titles together into clusters
-3. Create descriptive cluster names (2-5 words)
-4. Ensure each title is assigned to exactly one cluster
-5. Aim for 5-15 clusters depending on content diversity
-6. Focus on substantive themes, not superficial similarities
-
-Cluster names must be highly specific and include at least one explicit technical identifier, such as:
-- a model type or architecture (e.g., LLMs, Transformers, LaBSE, OOD models)
-- a technique or method (e.g., fine-tuning, post-training, recursive reasoning, structured memory)
-- a framework or technology (e.g., CUDA, ONNX Runtime, JetBrains PSI)
-- a domain or research area (e.g., academic publishing workflow, neurosymbolic AI, AI governance)
-
-Cluster names must be 2–10 words, technically precise, and uniquely descriptive of the cluster’s thematic scope.
-Do NOT use generic categories like “AI Tools”, “Machine Learning Research”, or “AI Ethics”.
-
-
-Titles to analyze:
-{json.dumps(titles, indent=2)}
-"""
+        prompt = self._subreddit_prompt.format(
+            subreddit_name=subreddit_name, titles_json=_titles_json(titles)
+        )
         
         logger.info(f"Clustering {len(titles)} posts from r/{subreddit_name}...")
         result = self.make_llm_call(prompt, ClusteredOutput)
@@ -272,53 +459,7 @@ Titles to analyze:
 
     def perform_clustering(self, titles):
         """Use LLM to cluster similar titles into topic groups."""
-        prompt = f"""
-You are a research assistant specializing in thematic analysis of social media content.
-
-Task: Analyze the provided post titles and organize them into meaningful, technically-specific topic clusters.
-
-Instructions:
-1. Identify common themes, technologies, methodologies, research areas, or discussion topics across the titles.
-2. Group semantically similar titles together into coherent clusters.
-3. Create highly specific, technically descriptive cluster names (2-10 words).
-4. Ensure each title is assigned to exactly one cluster.
-5. Aim for 5-15 clusters depending on the diversity and granularity of the content.
-6. Prioritize substantive thematic groupings over superficial keyword matches.
-
-Cluster Naming Requirements:
-Cluster names MUST be technically precise and include at least one explicit identifier from the following categories:
-- Model architectures or types (e.g., "LLMs", "Transformers", "Qwen2.5-Omni", "Diffusion Models")
-- Specific techniques or methods (e.g., "Fine-tuning", "Post-training", "Recursive Reasoning", "Attention Mechanisms", "RAG")
-- Frameworks, libraries, or technologies (e.g., "CUDA", "ONNX Runtime", "PyTorch", "JetBrains PSI", "TensorFlow")
-- Research domains or application areas (e.g., "Academic Publishing Workflow", "Neurosymbolic AI", "Biosignal Synthesis", "AI Governance")
-- Specific platforms or products (e.g., "Azure AI", "Gemini 3", "Claude API", "Perplexity")
-
-Cluster Name Standards:
-- Length: 2-10 words
-- Style: Technically precise and immediately informative
-- Uniqueness: Each cluster name should clearly distinguish its thematic scope from others
-- Avoid generic categories such as "AI Tools", "Machine Learning Research", "AI Applications", "AI Ethics", or "AI Development"
-
-Exclusion Rule:
-Completely exclude and do not cluster titles that are:
-- Meaningless or nonsensical
-- Meme-based or purely humorous content
-- Pop culture references without technical substance
-- Low-information or off-topic posts
-- Random personal anecdotes unrelated to technical content
-
-Do NOT create clusters for excluded content. Do NOT include such titles in any cluster. Simply omit them from the output entirely.
-
-Output Format:
-Return a JSON array of cluster objects. Each object should contain:
-- "cluster_name": A technically specific descriptive name following the naming requirements above
-- "titles": An array of post titles belonging to this cluster
-
-Titles to Analyze:
-{json.dumps(titles, indent=2)}
-
-Important: Only include titles that have genuine technical or professional content. Exclude all meme posts, jokes, and irrelevant content from your clustering entirely.
-"""
+        prompt = self._cluster_prompt.format(titles_json=_titles_json(titles))
         logger.info("Performing topic clustering via LLM...")
         result = self.make_llm_call(prompt, ClusteredOutput)
         if result is None:
@@ -571,12 +712,16 @@ Important: Only include titles that have genuine technical or professional conte
                     return self._get_default_report()
 
             # Step 3: Save final clusters
-            with open("data/social_trends_cluster.json", "w", encoding="utf-8") as f:
-                json.dump(final_clusters, f, indent=2, ensure_ascii=False)
+            write_msgpack(intermediate_path("social_trends_cluster"), final_clusters)
             logger.info(f"✅ Saved {len(final_clusters)} final clusters")
 
             # Step 4: Calculate relevance scores
-            trending_topics, cluster_metrics = self.calculate_relevance_scores(final_clusters, posts_by_title)
+            if len(posts_by_title) >= CPU_POOL_MIN_POSTS:
+                trending_topics, cluster_metrics = cpu_pool().submit(
+                    self.calculate_relevance_scores, final_clusters, posts_by_title
+                ).result()
+            else:
+                trending_topics, cluster_metrics = self.calculate_relevance_scores(final_clusters, posts_by_title)
             
             if not trending_topics:
                 logger.warning("No trending topics calculated. Returning default report.")
@@ -615,7 +760,7 @@ if __name__ == "__main__":
         client_id="ydYRJCnXguV_6gTnnNjmww",
         client_secret="I-dyOgNW3dFKu8jWjemWDd6hPqvkFw",
         user_agent="AICertsContentAgent/1.0",
-        max_workers=10
+        max_concurrent=10
     )
 
     keywords = ["MachineLearning", "AI", "DataScience"]
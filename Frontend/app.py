@@ -2,6 +2,7 @@ import streamlit as st
 import requests
 import pandas as pd
 import json
+import time
 from typing import List
 from pathlib import Path
 
@@ -16,6 +17,7 @@ BASE_URL = os.getenv("API_URL", "http://localhost:8000")
 
 PIPELINE_URL = f"{BASE_URL}/pipeline/run"
 TODAY_BRIEFS_URL = f"{BASE_URL}/briefs/today"
+POLL_INTERVAL_SECONDS = 5
 
 # API_URL = os.getenv("API_URL", "http://localhost:8000/pipeline/run")
 # TODAY_BRIEFS_URL = os.getenv("TODAY_BRIEFS_URL", "http://localhost:8000/briefs/today")
@@ -460,10 +462,25 @@ if submitted:
                 # API MODE (Hit FastAPI endpoint)
                 # -----------------------------
                 response = requests.post(PIPELINE_URL, json=payload)
-                if response.status_code != 200:
+                if response.status_code != 202:
                     st.error(f"❌ API Error: {response.text}")
                     st.stop()
-                result = response.json()
+                status_url = f"{BASE_URL}/pipeline/status/{response.json()['task_id']}"
+
+                # The run happens in the background; poll until it finishes
+                while True:
+                    time.sleep(POLL_INTERVAL_SECONDS)
+                    response = requests.get(status_url)
+                    if response.status_code != 200:
+                        st.error(f"❌ API Error: {response.text}")
+                        st.stop()
+                    run = response.json()
+                    if run["status"] != "running":
+                        break
+                if run["status"] == "failed":
+                    st.error(f"❌ Pipeline failed: {run['error']}")
+                    st.stop()
+                result = run["result"]
 
             # Store result in session state
             st.session_state.result = result